@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from utils.db import get_resume_count, get_avg_match_score, init_db
+from utils.model_registry import start_warmup
 
 # ✅ Set page config first
 st.set_page_config(page_title="Resume Tracker Dashboard", layout="wide")
@@ -8,6 +9,9 @@ st.set_page_config(page_title="Resume Tracker Dashboard", layout="wide")
 # ✅ Initialize database
 init_db()
 
+# ✅ Start loading the shared BERT model in the background while the user logs in
+start_warmup()
+
 # 🧠 Session state defaults
 if 'logged_in' not in st.session_state:
     st.session_state['logged_in'] = False
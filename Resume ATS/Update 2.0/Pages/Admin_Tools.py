@@ -1,8 +1,14 @@
+import os
 import streamlit as st
 import pandas as pd
-from datetime import datetime
 from utils.recruiter_db import register_user
-from utils.db import connect_db
+from utils.db import get_resume_filter_bounds, search_resumes, delete_resumes, delete_all_resumes
+from utils.exporter import (
+    EXPORT_COLUMNS, EXPORT_FORMATS, exportable_columns, count_resumes, prune_exports, prepare_export
+)
+from utils.metrics import get_stage_summary, get_throughput, get_slowest_files
+
+DELETE_PICKER_LIMIT = 50
 
 st.set_page_config(page_title="Admin Tools", layout="wide")
 st.title("🛠️ Admin Control Panel")
@@ -36,52 +42,122 @@ with st.form("register_form"):
 
 st.markdown("---")
 
-# ✅ Resume management with filtering
-conn = connect_db()
-df = pd.read_sql("SELECT * FROM resumes", conn)
+# ✅ Pipeline performance from the per-stage metrics hooks
+st.subheader("⏱️ Pipeline Performance")
+window = st.selectbox(
+    "Time window",
+    [1, 24, 168],
+    index=1,
+    format_func=lambda h: {1: "Last hour", 24: "Last 24 hours", 168: "Last 7 days"}[h]
+)
 
-st.subheader("📊 Filter Resumes")
+stage_summary = get_stage_summary(window)
+if stage_summary:
+    summary_df = pd.DataFrame(stage_summary).rename(columns={
+        'stage': "Stage", 'calls': "Calls", 'items': "Items", 'errors': "Errors",
+        'p50_ms': "p50 (ms)", 'p95_ms': "p95 (ms)", 'items_per_sec': "Items/sec"
+    })
+    st.dataframe(summary_df.round(2), use_container_width=True, hide_index=True)
+    st.caption("Extract and entities are timed per file; embed and insert per batch.")
 
-if not df.empty:
-    # ✅ Only Score filtering now
-    df['score'] = df['score'] * 100  # 🆕 Convert to percentage
-    min_score, max_score = df['score'].min(), df['score'].max()
+    throughput = pd.DataFrame(get_throughput(window))
+    if not throughput.empty:
+        st.markdown("**📈 Files extracted per hour**")
+        st.line_chart(throughput.set_index('hour')['items'])
 
+    slowest = pd.DataFrame(get_slowest_files(window))
+    if not slowest.empty:
+        st.markdown("**🐢 Slowest files**")
+        slowest['size_kb'] = (slowest['size_bytes'] / 1024).round(1)
+        st.dataframe(
+            slowest[['recorded_at', 'file_name', 'seconds', 'size_kb', 'pages', 'extractor', 'status']].round(2),
+            use_container_width=True, hide_index=True
+        )
+else:
+    st.info("No pipeline metrics recorded in this window yet.")
+
+st.markdown("---")
+
+# ✅ Resume management with filtering; the score filter runs in SQL
+st.subheader("📊 Filter Resumes")
+
+min_score, max_score = get_resume_filter_bounds()['score']
+filters = {}
+if min_score is not None:
+    min_score, max_score = min_score * 100, max_score * 100  # 🆕 Convert to percentage
     score_range = st.slider(
         "📈 Match Score Range (%)",
         float(min_score),
         float(max_score),
         (float(min_score), float(max_score))
     )
+    if score_range[0] > min_score or score_range[1] < max_score:
+        filters['score_range'] = (score_range[0] / 100, score_range[1] / 100)
 
-    filtered_df = df[
-        (df['score'] >= score_range[0]) &
-        (df['score'] <= score_range[1])
-    ]
-else:
-    filtered_df = df
+matched = count_resumes(filters)
+st.caption(f"{matched} resume(s) match the selected filters.")
+
+# ✅ Download filtered resumes, built only when requested; files left behind by
+# ended sessions are pruned by age
+def discard_export():
+    export = st.session_state.pop('admin_export', None)
+    if export and os.path.exists(export['path']):
+        os.remove(export['path'])
+
+prune_exports()
 
-# ✅ Download filtered resumes
 st.subheader("⬇️ Download Filtered Resumes")
-if not filtered_df.empty:
-    st.download_button(
-        "📄 Download CSV",
-        filtered_df.to_csv(index=False),
-        file_name="filtered_resumes.csv",
-        mime='text/csv'
-    )
+if matched:
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        export_format = st.radio("Format", EXPORT_FORMATS, format_func=str.upper, horizontal=True)
+    with col2:
+        available = list(exportable_columns())
+        export_columns = st.multiselect(
+            "Columns",
+            available,
+            default=[c for c in EXPORT_COLUMNS if c in available]
+        )
+
+    # A prepared file is kept on disk until the filters or options change
+    export_key = repr((sorted(filters.items()), export_format, export_columns))
+    export = st.session_state.get('admin_export')
+    if export and (export['key'] != export_key or not os.path.exists(export['path'])):
+        discard_export()
+
+    if st.button("📦 Prepare Export", disabled=not export_columns):
+        discard_export()
+        with st.spinner("Exporting..."):
+            path, rows = prepare_export(export_format, export_columns, filters)
+        st.session_state['admin_export'] = {'key': export_key, 'path': path, 'rows': rows}
+
+    export = st.session_state.get('admin_export')
+    if export:
+        with open(export['path'], "rb") as f:
+            st.download_button(
+                f"📄 Download {export_format.upper()} ({export['rows']} rows)",
+                f,
+                file_name=f"filtered_resumes.{export_format}",
+                mime='text/csv' if export_format == "csv" else 'application/vnd.apache.parquet'
+            )
 else:
     st.info("No resumes match the selected filters.")
 
 # ✅ Single Resume Deletion
 st.markdown("---")
 st.subheader("❌ Delete a Resume")
-if not filtered_df.empty:
-    resume_to_delete = st.selectbox("Select Resume", filtered_df['name'].tolist())
+delete_query = st.text_input("🔎 Find by Name", key="delete_name")
+matches = search_resumes({**filters, 'name': delete_query}, limit=DELETE_PICKER_LIMIT + 1)
+if len(matches) > DELETE_PICKER_LIMIT:
+    st.caption(f"Showing the first {DELETE_PICKER_LIMIT} matches; type a name to narrow them down.")
+names = {row['id']: row['name'] for row in matches[:DELETE_PICKER_LIMIT]}
+if names:
+    resume_to_delete = st.selectbox(
+        "Select Resume", list(names), format_func=lambda i: f"{names[i]} (#{i})"
+    )
     if st.button("🧹 Delete Selected Resume"):
-        conn.execute("DELETE FROM resumes WHERE name = ?", (resume_to_delete,))
-        conn.commit()
-        st.success(f"✅ Resume '{resume_to_delete}' deleted.")
+        delete_resumes([int(resume_to_delete)])
+        st.success(f"✅ Resume '{names[resume_to_delete]}' deleted.")
         st.rerun()
 
 else:
@@ -91,8 +167,7 @@ else:
 st.markdown("---")
 st.subheader("🚨 Reset Resume Database")
 if st.button("⚠️ Delete All Resumes"):
-    conn.execute("DELETE FROM resumes")
-    conn.commit()
+    delete_all_resumes()
     st.success("🧨 All resumes deleted!")
     st.rerun()
 
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from utils.db import connect_db
+from utils.db import get_dashboard_summary
 
 # ✅ Set page config first
 st.set_page_config(page_title="Dashboard", layout="wide")
@@ -14,26 +14,25 @@ if 'logged_in' not in st.session_state or not st.session_state['logged_in']:
 # ✅ Now continue building the page
 st.title("Resume Analytics Dashboard")
 
-df = pd.read_sql("SELECT * FROM resumes", connect_db())
+# ✅ Read the trigger-maintained summary tables instead of the full resumes table
+summary = get_dashboard_summary()
 
 col1, col2 = st.columns(2)
-col1.metric("Total Resumes", len(df))
-col2.metric("Avg Score", round(df['score'].mean(), 2) if not df.empty else "N/A")
+col1.metric("Total Resumes", summary['total'])
+col2.metric("Avg Score", round(summary['avg_score'], 2) if summary['avg_score'] is not None else "N/A")
 
 st.subheader("Match Score Distribution")
-fig = px.histogram(df, x="score", nbins=10, title="Score Distribution")
+bucket_df = pd.DataFrame(summary['score_buckets'], columns=['Bucket', 'Count'])
+bucket_df['Score'] = bucket_df['Bucket'].map(lambda b: f"{b:.1f}-{b + 0.1:.1f}")
+fig = px.bar(bucket_df, x="Score", y="Count", title="Score Distribution")
 st.plotly_chart(fig, use_container_width=True)
 
 st.subheader("Skill Frequency")
-skill_list = []
-df['skills'].dropna().apply(lambda x: skill_list.extend(x.lower().split(", ")))
-skill_df = pd.Series(skill_list).value_counts().reset_index()
-skill_df.columns = ['Skill', 'Count']
-fig2 = px.bar(skill_df.head(10), x='Skill', y='Count', title="Top 10 Skills")
+skill_df = pd.DataFrame(summary['top_skills'], columns=['Skill', 'Count'])
+fig2 = px.bar(skill_df, x='Skill', y='Count', title="Top 10 Skills")
 st.plotly_chart(fig2, use_container_width=True)
 
 st.subheader("Resume Status Overview")
-status_counts = df['status'].value_counts().reset_index()
-status_counts.columns = ['Status', 'Count']
+status_counts = pd.DataFrame(summary['status_counts'], columns=['Status', 'Count'])
 fig3 = px.pie(status_counts, names='Status', values='Count', title="Resume Pipeline")
 st.plotly_chart(fig3, use_container_width=True)
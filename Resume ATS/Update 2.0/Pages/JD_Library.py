@@ -1,6 +1,11 @@
 import streamlit as st
-import os
-import json
+import pandas as pd
+from utils.parser import rescore_jd, score_resumes
+from utils.jd_cache import cache_stats
+from utils.jd_store import sync_templates, save_template, list_templates, get_template_text, get_template_embeddings
+from utils.db import init_db, get_jd_ranking, get_resume_cards
+from utils.model_registry import get_model
+from utils.ann_index import get_index, search_index, recall_at_k
 
 st.set_page_config(page_title="Job Description Library", layout="wide")
 st.title("JD Library")
@@ -10,8 +15,9 @@ if 'logged_in' not in st.session_state or not st.session_state['logged_in']:
     st.warning("🔒 Please login to access this page.")
     st.stop()
 
-JD_DIR = "jd_templates"
-os.makedirs(JD_DIR, exist_ok=True)
+# ✅ Template store: files are only re-read when they changed on disk
+init_db()
+sync_templates()
 
 st.subheader("Create New JD Template")
 template_name = st.text_input("Template Name")
@@ -19,16 +25,90 @@ jd_text = st.text_area("Job Description Content", height=250)
 
 if st.button("Save Template"):
     if template_name:
-        with open(os.path.join(JD_DIR, f"{template_name}.json"), "w") as f:
-            json.dump({"jd": jd_text}, f)
+        # Skills and embedding are computed once here, not on every page load
+        with st.spinner("Indexing template..."):
+            save_template(template_name, jd_text, get_model())
         st.success(f"{template_name} saved!")
     else:
         st.warning("Template name required")
 
+CANDIDATE_POOL = 4  # index candidates fetched per requested result, then re-scored exactly
+
+def find_top_candidates(name, k):
+    # Approximate search with the stored template vector, then exact
+    # chunk-pooled scores for the shortlist
+    model = get_model()
+    candidate_ids, _ = search_index(get_template_embeddings([name], model)[0], k * CANDIDATE_POOL)
+    scores = score_resumes(candidate_ids.tolist(), get_template_text(name), model)
+    top = sorted(scores, key=scores.get, reverse=True)[:k]
+    cards = {card['id']: card for card in get_resume_cards(top)}
+    return [{**cards[i], 'score': scores[i]} for i in top if i in cards]
+
 st.subheader("View Existing Templates")
-files = [f for f in os.listdir(JD_DIR) if f.endswith(".json")]
-for f_name in files:
-    with open(os.path.join(JD_DIR, f_name)) as f:
-        data = json.load(f)
-    st.markdown(f"### {f_name.replace('.json', '')}")
-    st.code(data['jd'], language='markdown')
+templates = list_templates()
+for template in templates:
+    name = template['name']
+    st.markdown(f"### {name}")
+    st.caption(f"🛠️ Extracted skills: {', '.join(template['skills'])}")
+    st.caption(f"🕒 Updated: {template['updated_at'] or 'N/A'}")
+
+    # ✅ Full text is only loaded for templates that are opened
+    if st.toggle("📄 Show Description", key=f"show_{name}"):
+        st.code(get_template_text(name), language='markdown')
+
+    # ✅ Top candidates straight from the nearest-neighbour index
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        top_k = st.number_input("Top K", min_value=1, value=50, step=10, key=f"topk_{name}")
+    with col2:
+        st.write("")
+        find = st.button("🔎 Find Top Candidates", key=f"find_{name}")
+    if find:
+        with st.spinner("Searching candidates..."):
+            candidates = pd.DataFrame(find_top_candidates(name, int(top_k)))
+        if candidates.empty:
+            st.info("No embedded resumes to search yet.")
+        else:
+            candidates['score'] = (candidates['score'] * 100).round(2)
+            st.dataframe(
+                candidates[['name', 'email', 'file_name', 'status', 'score']].rename(columns={
+                    'name': "Candidate", 'email': "Email", 'file_name': "File", 'status': "Status", 'score': "Score (%)"
+                }),
+                use_container_width=True, hide_index=True
+            )
+
+# ✅ Re-rank stored resumes against a template from their stored embeddings and text
+st.subheader("🔁 Re-rank Stored Resumes")
+st.caption("Only resumes added since the last run are scored, or all of them after the template is edited.")
+rank_template = st.selectbox("Template", [t['name'] for t in templates]) if templates else None
+if rank_template and st.button("🔁 Re-score Resumes"):
+    with st.spinner("Scoring stored resumes..."):
+        jd_id, scored = rescore_jd(rank_template, get_template_text(rank_template), get_model())
+    st.success(f"✅ Scored {scored} resume(s) against {rank_template}.")
+
+    ranking = pd.DataFrame(get_jd_ranking(jd_id, limit=25))
+    if not ranking.empty:
+        ranking['score'] = (ranking['score'] * 100).round(2)
+        ranking['skill_overlap'] = (ranking['skill_overlap'] * 100).round(1)
+        st.dataframe(
+            ranking[['name', 'email', 'file_name', 'status', 'score', 'skill_overlap']].rename(columns={
+                'name': "Candidate", 'email': "Email", 'file_name': "File", 'status': "Status",
+                'score': "Score (%)", 'skill_overlap': "Skill Overlap (%)"
+            }),
+            use_container_width=True, hide_index=True
+        )
+
+# ✅ Shared JD cache usage (skills and embeddings reused across pages)
+stats = cache_stats()
+with st.sidebar:
+    st.subheader("🧠 JD Cache")
+    st.write(f"Hits: {stats['hits']} | Misses: {stats['misses']} | Evictions: {stats['evictions']}")
+    st.write(f"Entries: {stats['size']} / {stats['capacity']}")
+
+    # ✅ Nearest-neighbour candidate index
+    st.subheader("🧭 Candidate Index")
+    index = get_index()
+    st.write(f"Resumes: {len(index['ids'])} | Lists: {len(index['centroids']) or 'exact search'}")
+    if st.button("Check recall@50"):
+        recall = recall_at_k(50)
+        st.write(f"Recall@50 vs exact search: {recall:.1%}" if recall is not None else "Index is empty.")
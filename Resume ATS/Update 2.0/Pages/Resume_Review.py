@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from utils.db import connect_db
+from utils.db import (
+    init_db, search_resumes, get_resume_filter_bounds, get_resume_details, update_resume_status,
+    get_missing_skills, resume_cursor, RESUME_STATUSES
+)
 
 st.set_page_config(page_title="Review & Update Resumes", layout="wide")
 st.title("📋 Review & Update Resumes")
@@ -11,13 +14,9 @@ if 'logged_in' not in st.session_state or not st.session_state['logged_in']:
     st.warning("🔒 Please login to access this page.")
     st.stop()
 
-# ✅ Connect to DB
-conn = connect_db()
-df = pd.read_sql("SELECT * FROM resumes", conn)
-
-# ✅ Convert dates
-if 'upload_date' in df.columns:
-    df['upload_date'] = pd.to_datetime(df['upload_date'], errors='coerce')
+# ✅ Make sure filter columns and indexes exist
+init_db()
+bounds = get_resume_filter_bounds()
 
 # ✅ Filters
 st.subheader("🔍 Filters")
@@ -27,19 +26,26 @@ col1, col2, col3 = st.columns(3)
 with col1:
     name_filter = st.text_input("🔎 Search by Name")
 with col2:
-    skill_filter = st.text_input("🛠️ Search by Skill")
+    skill_filter = st.text_input("🛠️ Search by Skills (comma-separated, all must match)")
 with col3:
     status_filter = st.selectbox(
         "🔖 Filter by Status",
-        options=["All", "Pending", "Shortlisted", "Interviewed", "Rejected"],
+        options=["All"] + RESUME_STATUSES,
         index=0
     )
 
+# ✅ Ranked full-text search over name, skills, experience, education and notes
+text_query = st.text_input(
+    "📝 Search Resume Content",
+    help='Words must all match. Use "quotes" for an exact phrase and a trailing * for prefixes, e.g. "balance sheet" reconcil*'
+)
+
 # ✅ Score range slider
 st.subheader("📈 Score Range & 📅 Upload Date Filters")
 
-if not df.empty:
-    min_score, max_score = df['score'].min(), df['score'].max()
+min_score, max_score = bounds['score']
+if min_score is not None:
+    min_score, max_score = min_score * 100, max_score * 100
     if min_score == max_score:
         min_score = max(0, min_score - 5)
         max_score = min(100, max_score + 5)
@@ -50,43 +56,47 @@ if not df.empty:
         max_value=float(max_score),
         value=(float(min_score), float(max_score))
     )
-
-    min_date = df['upload_date'].min()
-    max_date = df['upload_date'].max()
-
-    if pd.isna(min_date) or pd.isna(max_date):
-        min_date = datetime.today()
-        max_date = datetime.today()
-
-    date_range = st.date_input(
-        "Select Upload Date Range",
-        (min_date, max_date)
-    )
 else:
-    score_range = (0, 100)
-    date_range = (datetime.today(), datetime.today())
-
-# ✅ Apply all filters
-if name_filter:
-    df = df[df['name'].str.contains(name_filter, case=False, na=False)]
-if skill_filter:
-    df = df[df['skills'].str.contains(skill_filter, case=False, na=False)]
-if status_filter != "All":
-    df = df[df['status'] == status_filter]
-if not df.empty:
-    df = df[
-        (df['score'] * 100 >= score_range[0]) &
-        (df['score'] * 100 <= score_range[1]) &
-        (df['upload_date'].dt.date >= date_range[0]) &
-        (df['upload_date'].dt.date <= date_range[1])
-    ]
+    score_range = None
+
+min_date, max_date = (pd.to_datetime(d, errors='coerce') for d in bounds['upload_date'])
+if pd.isna(min_date) or pd.isna(max_date):
+    min_date = datetime.today()
+    max_date = datetime.today()
+full_date_range = (min_date.date(), max_date.date())
+
+date_range = st.date_input(
+    "Select Upload Date Range",
+    full_date_range
+)
+
+page_size = st.selectbox("Resumes per page", [10, 25, 50], index=0)
+
+# ✅ Filters are pushed down to SQL; the date filter only applies once narrowed,
+# so resumes uploaded before dates were recorded stay visible by default
+filters = {'name': name_filter, 'skill': skill_filter, 'status': status_filter, 'text': text_query}
+if score_range and (score_range[0] > min_score or score_range[1] < max_score):
+    filters['score_range'] = (score_range[0] / 100, score_range[1] / 100)
+if isinstance(date_range, tuple) and len(date_range) == 2 and tuple(date_range) != full_date_range:
+    filters['date_range'] = date_range
+
+# ✅ Keyset pagination: a stack of "after id" cursors, reset when filters change
+filter_key = repr(sorted(filters.items())) + str(page_size)
+if st.session_state.get('review_filter_key') != filter_key:
+    st.session_state['review_filter_key'] = filter_key
+    st.session_state['review_cursors'] = [None]
+cursors = st.session_state['review_cursors']
+
+rows = search_resumes(filters, after=cursors[-1], limit=page_size + 1)
+has_next = len(rows) > page_size
+rows = rows[:page_size]
 
 # ✅ Display Resumes
 st.markdown("---")
 
-if not df.empty:
-    for _, row in df.iterrows():
-        score_percentage = row['score'] * 100
+if rows:
+    for row in rows:
+        score_percentage = (row['score'] or 0) * 100
 
         # Color based on score
         if score_percentage >= 85:
@@ -99,16 +109,16 @@ if not df.empty:
             badge_color = "red"
             match_label = "Low Match"
 
-        upload_date_display = row['upload_date'].strftime('%Y-%m-%d') if pd.notna(row['upload_date']) else "N/A"
-        last_updated_display = row['last_updated'] if 'last_updated' in row and pd.notna(row['last_updated']) else "N/A"
+        upload_date_display = row['upload_date'][:10] if row['upload_date'] else "N/A"
+        last_updated_display = row['last_updated'] or "N/A"
 
         # ✅ Stylish resume card
         with st.container():
             st.markdown(f"""
             <div style='padding:15px; border:1px solid #ccc; border-radius:12px; margin-bottom:12px; background-color:#f9f9f9'>
                 <h4 style='margin-bottom:5px;'>
-                    {row['name']} | 
-                    <a href="mailto:{row['email']}" style='text-decoration:none;'>{row['email']}</a> 
+                    {row['name']} |
+                    <a href="mailto:{row['email']}" style='text-decoration:none;'>{row['email']}</a>
                     <span style='background-color:{badge_color}; color:white; padding:5px 10px; border-radius:20px; font-size:14px; margin-left:8px;'>{score_percentage:.2f}% - {match_label}</span>
                 </h4>
                 <p style='font-size:13px; color:gray; margin-top:-10px;'>
@@ -116,23 +126,24 @@ if not df.empty:
                 </p>
             """, unsafe_allow_html=True)
 
-            with st.expander("🔎 View Resume Details"):
+            # ✅ Large text fields are only fetched for cards that are opened
+            if st.toggle("🔎 View Resume Details", key=f"open_{row['id']}"):
+                details = get_resume_details(row['id'])
+
                 st.markdown("### 🛠 Skills")
-                st.write(row['skills'])
+                st.write(details['skills'])
 
                 st.markdown("### 💼 Experience")
-                st.write(row['experience'])
+                st.write(details['experience'])
 
                 st.markdown("### 🎓 Education")
-                st.write(row['education'])
+                st.write(details['education'])
 
                 required_skills = st.text_input(
                     "Required Skills (comma-separated)", key=f"req_{row['id']}"
                 )
                 if required_skills:
-                    existing = set(row['skills'].lower().split(", "))
-                    required = set([s.strip().lower() for s in required_skills.split(",")])
-                    missing = required - existing
+                    missing = get_missing_skills(row['id'], required_skills.split(","))
                     if missing:
                         st.warning(f"⚠️ Missing Skills: {', '.join(missing)}")
                     else:
@@ -140,27 +151,36 @@ if not df.empty:
 
                 new_status = st.selectbox(
                     "Update Status",
-                    ["Pending", "Shortlisted", "Interviewed", "Rejected"],
-                    index=["Pending", "Shortlisted", "Interviewed", "Rejected"].index(
-                        row['status'] if row['status'] else "Pending"
+                    RESUME_STATUSES,
+                    index=RESUME_STATUSES.index(
+                        row['status'] if row['status'] in RESUME_STATUSES else "Pending"
                     ),
                     key=f"status_{row['id']}"
                 )
                 new_notes = st.text_area(
                     "Recruiter Notes",
-                    value=row['notes'] or "",
+                    value=details['notes'] or "",
                     key=f"note_{row['id']}"
                 )
 
                 if st.button("💾 Save Updates", key=f"save_{row['id']}"):
-                    conn.execute(
-                        "UPDATE resumes SET status=?, notes=?, last_updated=? WHERE id=?",
-                        (new_status, new_notes, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), row['id'])
-                    )
-                    conn.commit()
+                    update_resume_status(row['id'], new_status, new_notes)
                     st.success("✅ Resume updated successfully.")
                     st.rerun()
 
             st.markdown("</div>", unsafe_allow_html=True)
 else:
     st.info("ℹ️ No resumes found with current filters.")
+
+# ✅ Page navigation
+prev_col, page_col, next_col = st.columns([1, 2, 1])
+with prev_col:
+    if st.button("◀ Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+with page_col:
+    st.caption(f"Page {len(cursors)}")
+with next_col:
+    if st.button("Next ▶", disabled=not has_next):
+        cursors.append(resume_cursor(rows[-1]))
+        st.rerun()
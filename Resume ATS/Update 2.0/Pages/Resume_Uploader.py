@@ -1,9 +1,7 @@
 import streamlit as st
 import pandas as pd
-from utils.parser import process_resume_file
-from utils.db import insert_resume, init_db
-from sentence_transformers import SentenceTransformer
-from datetime import datetime
+from utils.db import init_db
+from utils.jobs import init_jobs, submit_job, has_active_jobs, list_jobs, get_job_files
 
 # ✅ Page setup
 st.set_page_config(page_title="Upload Resumes", layout="wide")
@@ -14,15 +12,16 @@ if 'logged_in' not in st.session_state or not st.session_state['logged_in']:
     st.warning("🔒 Please login to access this page.")
     st.stop()
 
-# ✅ Initialize database
+# ✅ Initialize database and the shared background job queue
 init_db()
+init_jobs()
 
-# ✅ Load BERT model once
-@st.cache_resource(show_spinner="Loading BERT Model...")
-def load_model():
-    return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-
-model = load_model()
+def match_quality(score_percentage):
+    if score_percentage >= 85:
+        return "Excellent Match"
+    elif 70 <= score_percentage < 85:
+        return "Good Match"
+    return "Low Match"
 
 # ✅ Input fields
 st.subheader("📝 Job Description")
@@ -35,57 +34,72 @@ uploaded_files = st.file_uploader(
     accept_multiple_files=True
 )
 
-# ✅ Main processing logic
+# ✅ Uploads are queued and parsed in the background, so this page stays responsive
 if uploaded_files and job_description:
-    st.subheader("⏳ Processing Resumes...")
-
-    upload_results = []  # 🆕 Collect results here
-
-    for file in uploaded_files:
-        with st.spinner(f"Processing {file.name}..."):
-            try:
-                result = process_resume_file(file, job_description, model)
-                insert_resume(file.name, result)
-
-                score_percentage = result['score'] * 100
-                upload_date_now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # 🆕 Capture upload time
-
-                if score_percentage >= 85:
-                    color = "green"
-                    label = "Excellent Match"
-                elif 70 <= score_percentage < 85:
-                    color = "orange"
-                    label = "Good Match"
-                else:
-                    color = "red"
-                    label = "Low Match"
-
-                # ✅ Append result for summary table
-                upload_results.append({
-                    "Resume": file.name,
-                    "Score (%)": round(score_percentage, 2),
-                    "Match Quality": label,
-                    "Upload Date": upload_date_now  # 🆕 Include Upload Date
-                })
-
-                # ✅ Show individual upload result
-                st.markdown(f"""
-                <div style='padding:12px; border:1px solid #ccc; border-radius:10px; margin-bottom:12px; background-color:#f9f9f9'>
-                    <strong>✅ {file.name}</strong><br>
-                    <span style='background-color:{color}; padding:5px 10px; border-radius:12px; color:white; font-size:14px;'>
-                        Score: {score_percentage:.2f}% ({label})
-                    </span><br>
-                    <small>📅 Uploaded: {upload_date_now}</small>
-                </div>
-                """, unsafe_allow_html=True)
-
-            except Exception as e:
-                st.error(f"❌ Failed to process **{file.name}**: {e}")
-
-    # ✅ After all uploads, show a summary table
+    if st.button("🚀 Submit for Processing"):
+        job_id = submit_job(uploaded_files, job_description, submitted_by=st.session_state.get('role'))
+        st.session_state['upload_job_id'] = job_id
+        st.success(f"✅ Job #{job_id} queued with {len(uploaded_files)} resume(s).")
+else:
+    if uploaded_files and not job_description:
+        st.warning("⚠️ Please paste a Job Description before processing.")
+    elif job_description and not uploaded_files:
+        st.warning("⚠️ Please upload at least one resume file to continue.")
+
+# ✅ Live job status, refreshed in place without rerunning the whole page;
+# it only polls while a job is queued or running
+polling = has_active_jobs()
+
+@st.fragment(run_every=2 if polling else None)
+def show_jobs():
+    if polling and not has_active_jobs():
+        st.rerun()  # last job finished: rerun the page once to stop polling
+    jobs = list_jobs()
+    if not jobs:
+        return
+
+    st.markdown("---")
+    st.subheader("⏳ Processing Jobs")
+    for job in jobs[:5]:
+        progress = job['processed'] / job['total'] if job['total'] else 1.0
+        st.progress(progress, text=f"Job #{job['id']} · {job['status']} · {job['processed']}/{job['total']} files · queued {job['created_at']}")
+        if job['error']:
+            st.error(f"❌ Job #{job['id']} failed: {job['error']}")
+
+    job_ids = [job['id'] for job in jobs]
+    default_id = st.session_state.get('upload_job_id', job_ids[0])
+    job_id = st.selectbox(
+        "📋 Show results for job",
+        job_ids,
+        index=job_ids.index(default_id) if default_id in job_ids else 0,
+        format_func=lambda i: f"Job #{i}"
+    )
+    files = get_job_files(job_id)
+
+    upload_results = []
+    skipped_files = []
+    for item in files:
+        if item['status'] == 'skipped':
+            skipped_files.append(item['file_name'])
+        elif item['status'] == 'failed':
+            st.error(f"❌ Failed to process **{item['file_name']}**: {item['error']}")
+        elif item['status'] == 'done':
+            score_percentage = item['score'] * 100
+            upload_results.append({
+                "Resume": item['file_name'],
+                "Score (%)": round(score_percentage, 2),
+                "Match Quality": match_quality(score_percentage),
+                "Resume ID": item['resume_id']
+            })
+
+    # ✅ Report duplicates that were skipped without parsing
+    if skipped_files:
+        st.info(f"⏭️ Skipped {len(skipped_files)} duplicate file(s) already in the database: {', '.join(skipped_files)}")
+
     if upload_results:
-        st.markdown("---")
         st.subheader("📋 Upload Summary Table")
+        st.caption(f"✅ {len(upload_results)} processed | ⏭️ {len(skipped_files)} skipped as duplicates | "
+                   f"⏳ {sum(item['status'] == 'queued' for item in files)} pending")
 
         summary_df = pd.DataFrame(upload_results)
         summary_df = summary_df.sort_values(by="Score (%)", ascending=False)  # Sort by best matches
@@ -95,12 +109,8 @@ if uploaded_files and job_description:
         st.download_button(
             label="📥 Download Upload Summary as CSV",
             data=summary_df.to_csv(index=False),
-            file_name="upload_summary.csv",
+            file_name=f"upload_summary_job_{job_id}.csv",
             mime="text/csv"
         )
 
-else:
-    if uploaded_files and not job_description:
-        st.warning("⚠️ Please paste a Job Description before processing.")
-    elif job_description and not uploaded_files:
-        st.warning("⚠️ Please upload at least one resume file to continue.")
+show_jobs()
@@ -1,9 +1,10 @@
 import streamlit as st
-import json
-import os
+import numpy as np
 import pandas as pd
-from utils.db import connect_db
-from sentence_transformers import SentenceTransformer, util
+from utils.db import connect_db, init_db
+from utils.parser import get_resume_chunk_embeddings, score_resumes, pool_scores, top_k_scores
+from utils.jd_store import sync_templates, list_templates, get_template_text, get_template_embeddings
+from utils.model_registry import get_model, is_model_loaded
 
 # ✅ Page setup
 st.set_page_config(page_title="Reverse JD Matching", layout="wide")
@@ -14,44 +15,77 @@ if 'logged_in' not in st.session_state or not st.session_state['logged_in']:
     st.warning("🔒 Please login to access this page.")
     st.stop()
 
-# ✅ Load BERT model once and cache it
-@st.cache_resource(show_spinner="Loading BERT model...")
-def load_model():
-    return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-
-model = load_model()
+# ✅ Shared BERT model (loaded once per process, usually already warm)
+if is_model_loaded():
+    model = get_model()
+else:
+    with st.spinner("Loading BERT model..."):
+        model = get_model()
 
 # ✅ Load resume data from DB
 conn = connect_db()
 resumes = pd.read_sql("SELECT id, name, file_name FROM resumes", conn)
 
-# ✅ Load JD templates
-JD_DIR = "jd_templates"
-jd_files = [f for f in os.listdir(JD_DIR) if f.endswith(".json")]
+# ✅ JD templates from the indexed store; text is loaded only for the one in use
+init_db()
+sync_templates()
+jd_names = [t['name'] for t in list_templates()]
+
+# ✅ Matching mode
+mode = st.radio(
+    "Matching Mode",
+    ["🎯 One Resume ➜ One JD", "📄 One Resume ➜ All JDs", "📝 One JD ➜ All Resumes"],
+    horizontal=True
+)
+
+if mode == "🎯 One Resume ➜ One JD":
+    # ✅ UI selections
+    selected_resume = st.selectbox("📄 Select Resume", resumes['name'].tolist())
+    selected_jd = st.selectbox("📝 Select JD Template", jd_names)
+
+    # ✅ Matching logic
+    if st.button("🔍 Match Now"):
+        resume_row = resumes[resumes['name'] == selected_resume].iloc[0]
+
+        resume_id = int(resume_row['id'])
+
+        # Load JD content
+        jd_text = get_template_text(selected_jd)
+
+        # BERT-based score pooled over the chunk embeddings stored at upload time
+        score = score_resumes([resume_id], jd_text, model)[resume_id]
+
+        # Display result
+        st.success(f"✅ Match Score with **{selected_jd}** JD: `{score*100:.2f}`")
+
+elif mode == "📄 One Resume ➜ All JDs":
+    selected_resume = st.selectbox("📄 Select Resume", resumes['name'].tolist())
+    top_k = st.number_input("Show top K templates", min_value=1, value=10, step=1)
 
-# ✅ UI selections
-selected_resume = st.selectbox("📄 Select Resume", resumes['name'].tolist())
-selected_jd = st.selectbox("📝 Select JD Template", [f.replace(".json", "") for f in jd_files])
+    if st.button("🔍 Rank Templates") and jd_names:
+        resume_id = int(resumes[resumes['name'] == selected_resume].iloc[0]['id'])
+        chunk_vectors = get_resume_chunk_embeddings([resume_id], model)[resume_id]
 
-# ✅ Matching logic
-if st.button("🔍 Match Now"):
-    resume_row = resumes[resumes['name'] == selected_resume].iloc[0]
+        # Template embeddings were computed when each template was saved
+        jd_embs = get_template_embeddings(jd_names, model)
+        top, scores = top_k_scores(pool_scores(chunk_vectors, jd_embs), top_k)
 
-    # Fetch resume text from DB (combined fields)
-    resume_text = conn.execute("""
-        SELECT experience || ' ' || education || ' ' || skills 
-        FROM resumes 
-        WHERE id = ?
-    """, (resume_row['id'],)).fetchone()[0]
+        st.dataframe(pd.DataFrame({
+            "JD Template": [jd_names[i] for i in top],
+            "Score (%)": np.round(scores * 100, 2)
+        }), use_container_width=True, hide_index=True)
 
-    # Load JD content
-    with open(os.path.join(JD_DIR, f"{selected_jd}.json"), "r", encoding="utf-8") as f:
-        jd_text = json.load(f).get("jd", "")
+else:
+    selected_jd = st.selectbox("📝 Select JD Template", jd_names)
+    top_k = st.number_input("Show top K resumes", min_value=1, value=20, step=1)
 
-    # BERT-based score calculation
-    resume_emb = model.encode(resume_text, convert_to_tensor=True)
-    jd_emb = model.encode(jd_text, convert_to_tensor=True)
-    score = util.cos_sim(resume_emb, jd_emb).item()
+    if st.button("🔍 Rank Resumes") and not resumes.empty:
+        # Stored chunk embeddings of every resume scored in one pass
+        scored = score_resumes(resumes['id'].astype(int).tolist(), get_template_text(selected_jd), model)
+        ranked = resumes[resumes['id'].isin(scored.keys())].reset_index(drop=True)
+        top, scores = top_k_scores([scored[int(i)] for i in ranked['id']], top_k)
 
-    # Display result
-    st.success(f"✅ Match Score with **{selected_jd}** JD: `{score*100:.2f}`")
+        result = ranked.iloc[top][['name', 'file_name']].copy()
+        result.columns = ["Candidate", "File"]
+        result["Score (%)"] = np.round(scores * 100, 2)
+        st.dataframe(result, use_container_width=True, hide_index=True)
@@ -2,11 +2,14 @@
 import re
 import docx2txt
 from pdfminer.high_level import extract_text
-from sentence_transformers import SentenceTransformer, util
 from PIL import Image
 import pytesseract
+from utils.skills import compile_skill_matcher, match_skills
+from utils.parser import sectionize
+from utils.model_registry import get_model
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+KEYWORDS = ['python', 'sql', 'excel', 'java', 'react', 'power bi']
+keyword_matcher = compile_skill_matcher(KEYWORDS)
 
 def extract_text_from_pdf(file):
     return extract_text(file)
@@ -26,11 +29,11 @@ def extract_entities(text):
     email = re.search(r'[\w\.-]+@[\w\.-]+', text)
     phone = re.search(r'(\+?\d{1,3}[\s-])?(?:\(?\d{2,4}\)?[\s-]?)?\d{6,10}', text)
 
-    keywords = ['python', 'sql', 'excel', 'java', 'react', 'power bi']
-    found_skills = [k for k in keywords if k in text.lower()]
+    found_skills = match_skills(keyword_matcher, text)
 
-    experience = extract_section(text, ['experience', 'work history'])
-    education = extract_section(text, ['education', 'academic'])
+    sections = sectionize(text)
+    experience = sections.get('experience', {}).get('text', '')
+    education = sections.get('education', {}).get('text', '')
 
     return {
         'name': name,
@@ -41,24 +44,9 @@ def extract_entities(text):
         'education': education
     }
 
-def extract_section(text, keywords):
-    lines = text.lower().split('\n')
-    section = []
-    found = False
-    for line in lines:
-        if any(k in line for k in keywords):
-            found = True
-            continue
-        if found and line.strip() == "":
-            break
-        if found:
-            section.append(line)
-    return '\n'.join(section).strip()
-
 def match_score(clean_resume_text, clean_jd_text):
-    resume_vec = model.encode(clean_resume_text, convert_to_tensor=True)
-    jd_vec = model.encode(clean_jd_text, convert_to_tensor=True)
-    return util.cos_sim(resume_vec, jd_vec).item()
+    resume_vec, jd_vec = get_model().encode([clean_resume_text, clean_jd_text], normalize_embeddings=True)
+    return float(resume_vec @ jd_vec)
 
 def skill_overlap(resume_skills, jd_skills):
     resume_set = set(resume_skills.lower().split(", "))
@@ -84,7 +72,7 @@ def process_resume_file(file, jd_text):
     score = match_score(cleaned_resume, cleaned_jd)
 
     # Also calculate skill overlap for clarity
-    jd_skills = ', '.join([kw for kw in ['python', 'sql', 'excel', 'java', 'react', 'power bi'] if kw in jd_text.lower()])
+    jd_skills = ', '.join(match_skills(keyword_matcher, jd_text))
     overlap_score = skill_overlap(entities['skills'], jd_skills)
 
     # Average both scores for final
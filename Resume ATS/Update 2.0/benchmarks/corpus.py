@@ -0,0 +1,122 @@
+import json
+import os
+import random
+import docx
+from fpdf import FPDF
+from PIL import Image, ImageDraw
+
+# Deterministic synthetic resumes and JDs for the benchmark suite. The same
+# (size, seed, formats) always produces the same files, and an existing corpus
+# with a matching manifest is reused instead of regenerated.
+
+FIRST_NAMES = ["Aarav", "Priya", "John", "Maria", "Wei", "Fatima", "Lucas", "Emma", "Ravi", "Sofia", "Omar", "Hannah"]
+LAST_NAMES = ["Sharma", "Patel", "Smith", "Garcia", "Chen", "Khan", "Muller", "Brown", "Iyer", "Rossi", "Ali", "Kim"]
+SKILLS = [
+    "python", "sql", "excel", "power bi", "tableau", "java", "react", "node.js", "aws", "docker",
+    "kubernetes", "machine learning", "pandas", "gaap", "ifrs", "quickbooks", "sap", "tally",
+    "financial reporting", "reconciliation", "auditing", "javascript", "c++", "git", "linux",
+]
+ROLES = ["Data Analyst", "Software Engineer", "Senior Accountant", "ML Engineer", "Financial Analyst", "DevOps Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Ltd", "Stark Industries", "Wayne Enterprises", "Hooli"]
+DEGREES = ["B.Tech Computer Science", "B.Com Accounting", "MBA Finance", "M.Sc Statistics", "BSc Mathematics"]
+VERBS = ["Built", "Led", "Automated", "Reconciled", "Designed", "Migrated", "Reduced", "Analyzed", "Delivered"]
+OBJECTS = ["monthly close reports", "ETL pipelines", "customer dashboards", "ledger reconciliations",
+           "microservices", "forecasting models", "audit workpapers", "CI/CD workflows", "vendor payments"]
+
+FORMATS = ("pdf", "docx", "png")
+
+
+# =====================
+# Text Generation
+# =====================
+def resume_lines(rng):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, rng.randint(4, 10))
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +91 98{rng.randint(10000000, 99999999)}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(ROLES)} with {rng.randint(1, 15)} years of experience in {', '.join(skills[:3])}.",
+        "",
+        "EXPERIENCE",
+    ]
+    # 1 to 6 jobs, so documents range from half a page to several pages
+    for _ in range(rng.randint(1, 6)):
+        lines.append(f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({rng.randint(2010, 2020)} - {rng.randint(2021, 2025)})")
+        for _ in range(rng.randint(3, 8)):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)}, "
+                         f"improving turnaround by {rng.randint(5, 60)}%.")
+    lines += ["", "EDUCATION", f"{rng.choice(DEGREES)}, {rng.randint(2005, 2020)}", "", "SKILLS", ", ".join(skills)]
+    return lines
+
+def jd_text(rng):
+    role = rng.choice(ROLES)
+    skills = rng.sample(SKILLS, rng.randint(5, 9))
+    return (f"We are hiring a {role}. You will own {rng.choice(OBJECTS)} and {rng.choice(OBJECTS)}.\n"
+            f"Requirements: {', '.join(skills)}.\n"
+            f"Nice to have: {rng.randint(2, 8)}+ years of experience and strong communication.")
+
+
+# =====================
+# File Writers
+# =====================
+def write_pdf(path, lines):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    for line in lines:
+        pdf.multi_cell(0, 5, line)
+    pdf.output(path)
+
+def write_docx(path, lines):
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+def write_png(path, lines):
+    # Letter page at ~150 dpi, so the OCR path sees realistic image sizes
+    image = Image.new("L", (1275, 1650), 255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines[:100]):
+        draw.text((60, 60 + i * 16), line, fill=0)
+    image.save(path)
+
+WRITERS = {"pdf": write_pdf, "docx": write_docx, "png": write_png}
+
+
+# =====================
+# Corpus
+# =====================
+def generate_corpus(out_dir, size=100, seed=42, formats=FORMATS, jd_count=5):
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    params = {"size": size, "seed": seed, "formats": list(formats), "jd_count": jd_count}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["params"] == params:
+            return manifest
+
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(out_dir, "resumes"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "jds"), exist_ok=True)
+
+    resumes = []
+    for i in range(size):
+        file_format = formats[i % len(formats)]
+        rel_path = os.path.join("resumes", f"resume_{i:05d}.{file_format}")
+        WRITERS[file_format](os.path.join(out_dir, rel_path), resume_lines(rng))
+        resumes.append(rel_path)
+
+    jds = []
+    for i in range(jd_count):
+        rel_path = os.path.join("jds", f"jd_{i:03d}.txt")
+        with open(os.path.join(out_dir, rel_path), "w", encoding="utf-8") as f:
+            f.write(jd_text(rng))
+        jds.append(rel_path)
+
+    manifest = {"params": params, "resumes": resumes, "jds": jds}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+from benchmarks.corpus import FORMATS, generate_corpus
+from utils import ann_index, db, metrics, ocr
+from utils.connections import close_connections
+from utils.extraction import extract_text
+from utils.parser import (
+    CHUNK_POOLING, extract_entities, extract_skills_from_jd, encode_chunks, chunk_text, pooled_scores,
+    get_jd_embedding, attach_embedding
+)
+
+# Times each pipeline stage separately on a synthetic corpus:
+#   python -m benchmarks.run_benchmarks --size 1000
+#   python -m benchmarks.run_benchmarks --compare benchmarks/results/before.json benchmarks/results/after.json
+# Runs against a throwaway database and a cold OCR cache, never resumes.db;
+# both live in a temp directory that is removed when the run ends.
+
+STAGES = ['extract', 'extract_entities', 'extract_skills_from_jd', 'embed', 'insert_resume']
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies, items, errors=0, rss_before=None):
+    # ru_maxrss only ever rises, so a stage's memory cost is how far it pushed
+    # the high-water mark above where it stood when the stage began
+    rss_after = peak_rss_mb()
+    latencies = np.asarray(latencies, dtype=np.float64)
+    total = float(latencies.sum())
+    return {
+        'items': items,
+        'errors': errors,
+        'total_s': round(total, 4),
+        'throughput_per_s': round(items / total, 2) if total else None,
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3) if len(latencies) else None,
+        'p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 3) if len(latencies) else None,
+        'rss_growth_mb': round(rss_after - rss_before, 1) if rss_before is not None else None,
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(args):
+    corpus_dir = args.corpus_dir or os.path.join("benchmarks", "corpus", f"{args.size}_{args.seed}")
+    print(f"📦 Preparing corpus of {args.size} resumes in {corpus_dir}...", file=sys.stderr)
+    manifest = generate_corpus(corpus_dir, args.size, args.seed, args.formats)
+    jds = []
+    for rel_path in manifest['jds']:
+        with open(os.path.join(corpus_dir, rel_path), "r", encoding="utf-8") as f:
+            jds.append(f.read())
+
+    with tempfile.TemporaryDirectory(prefix="ats_bench_") as scratch:
+        ocr.OCR_CACHE_DIR = os.path.join(scratch, "ocr_cache")
+        db.DB_PATH = os.path.join(scratch, "bench.db")
+        db.init_db()
+        try:
+            stages, meta_model = run_stages(args, corpus_dir, manifest, jds)
+        finally:
+            # Everything that writes next to the database is done before it is removed
+            metrics.flush()
+            ann_index.save_index()
+            close_connections()
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'size': args.size,
+            'seed': args.seed,
+            'formats': list(args.formats),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            **meta_model,
+        },
+        'stages': stages,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_stages(args, corpus_dir, manifest, jds):
+    stages = {}
+
+    # Extraction, one file at a time so per-file latency is meaningful
+    texts, latencies, errors = [], [], 0
+    rss = peak_rss_mb()
+    for rel_path in manifest['resumes']:
+        with open(os.path.join(corpus_dir, rel_path), "rb") as f:
+            start = time.perf_counter()
+            try:
+                texts.append((rel_path, extract_text(f)))
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+    stages['extract'] = summarize(latencies, len(texts), errors, rss)
+    print(f"✅ extract: {len(texts)} ok, {errors} failed", file=sys.stderr)
+
+    # JD skill extraction, uncached, cycled over the JDs once per resume
+    rss = peak_rss_mb()
+    latencies = [timed(extract_skills_from_jd, jds[i % len(jds)])[1] for i in range(len(texts))]
+    stages['extract_skills_from_jd'] = summarize(latencies, len(latencies), rss_before=rss)
+
+    records, latencies = [], []
+    rss = peak_rss_mb()
+    for i, (rel_path, text) in enumerate(texts):
+        data, seconds = timed(extract_entities, text, jds[i % len(jds)])
+        records.append((rel_path, text, data))
+        latencies.append(seconds)
+    stages['extract_entities'] = summarize(latencies, len(latencies), rss_before=rss)
+
+    meta_model = {}
+    if not args.no_embed:
+        from utils.model_registry import EMBEDDING_BACKEND, get_model
+        rss = peak_rss_mb()
+        model, load_seconds = timed(get_model)
+        meta_model = {'backend': EMBEDDING_BACKEND, 'pooling': CHUNK_POOLING, 'model_load_s': round(load_seconds, 3)}
+        jd_embedding = get_jd_embedding(jds[0], model)
+        latencies = []
+        for start in range(0, len(records), args.batch_size):
+            batch = records[start:start + args.batch_size]
+            began = time.perf_counter()
+            chunk_sets = encode_chunks([chunk_text(text) for _, text, _ in batch], model, args.batch_size)
+            scores = pooled_scores(chunk_sets, jd_embedding)
+            latencies.append(time.perf_counter() - began)
+            for (_, _, data), chunk_vectors, score in zip(batch, chunk_sets, scores):
+                data['score'] = float(score)
+                attach_embedding(data, chunk_vectors)
+        # Latency is per batch here; throughput is still resumes per second
+        stages['embed'] = summarize(latencies, len(records), rss_before=rss)
+        stages['embed']['batch_size'] = args.batch_size
+    else:
+        for _, _, data in records:
+            data['score'] = 0.0
+
+    rss = peak_rss_mb()
+    latencies = [timed(db.insert_resume, os.path.basename(rel_path), data)[1] for rel_path, _, data in records]
+    stages['insert_resume'] = summarize(latencies, len(latencies), rss_before=rss)
+    return stages, meta_model
+
+
+def print_report(report):
+    print(f"{'Stage':<24}{'Items':>8}{'Items/sec':>12}{'p50 ms':>10}{'p95 ms':>10}{'+RSS MB':>10}")
+    for stage in STAGES:
+        s = report['stages'].get(stage)
+        if s is None:
+            continue
+        fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+        print(f"{stage:<24}{s['items']:>8}{fmt(s['throughput_per_s'], '>12.1f')}"
+              f"{fmt(s['p50_ms'], '>10.2f')}{fmt(s['p95_ms'], '>10.2f')}{fmt(s.get('rss_growth_mb'), '>10.1f')}")
+    if report.get('peak_rss_mb') is not None:
+        print(f"Peak RSS for the whole run: {report['peak_rss_mb']:.1f} MB")
+
+
+def compare(base_path, new_path):
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"Base: {base_path} ({base['meta']['timestamp']}, {base['meta']['size']} resumes)")
+    print(f"New:  {new_path} ({new['meta']['timestamp']}, {new['meta']['size']} resumes)")
+    print(f"{'Stage':<24}{'Items/sec':>22}{'Speedup':>10}{'p95 ms':>22}")
+    for stage in STAGES:
+        a, b = base['stages'].get(stage), new['stages'].get(stage)
+        if not a or not b or not a['throughput_per_s'] or not b['throughput_per_s']:
+            continue
+        speedup = b['throughput_per_s'] / a['throughput_per_s']
+        print(f"{stage:<24}{a['throughput_per_s']:>10.1f} → {b['throughput_per_s']:<9.1f}{speedup:>9.2f}x"
+              f"{a['p95_ms']:>10.2f} → {b['p95_ms']:<9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume pipeline stage by stage.")
+    parser.add_argument("--size", type=int, default=100, help="number of synthetic resumes (100 to 50000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--corpus-dir", help="where the corpus is generated and reused")
+    parser.add_argument("--batch-size", type=int, default=32, help="embedding batch size")
+    parser.add_argument("--no-embed", action="store_true", help="skip the embedding stage (no model needed)")
+    parser.add_argument("--out", help="results JSON path (default benchmarks/results/bench_<size>_<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two results files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    report = run(args)
+    out = args.out or os.path.join(RESULTS_DIR, f"bench_{args.size}_{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"\n💾 Results written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import ExitStack
+from utils.db import init_db, insert_resumes_bulk
+from utils.extraction import EXTRACT_WORKERS, set_extract_workers
+from utils.model_registry import get_model
+from utils.parser import process_resume_files, stage_timer
+
+# Headless alternative to the Resume Uploader page for large folder dumps:
+#   python bulk_ingest.py /data/job_fair --jd-template "Senior US Accountant" --workers 16
+
+JD_DIR = "jd_templates"
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp')
+STAGES = ['dedup', 'extract', 'entities', 'embed', 'insert']
+
+
+def find_resume_files(directory):
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                paths.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(paths)
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def append_checkpoint(path, rel_paths):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(p + "\n" for p in rel_paths)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_jd(args):
+    if args.jd:
+        return args.jd
+    with open(os.path.join(JD_DIR, f"{args.jd_template}.json"), "r", encoding="utf-8") as f:
+        return json.load(f).get("jd", "")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest a folder of resumes into the ATS database.")
+    parser.add_argument("directory", help="Folder to scan (recursively) for resumes")
+    jd_group = parser.add_mutually_exclusive_group(required=True)
+    jd_group.add_argument("--jd", help="Job description text to score against")
+    jd_group.add_argument("--jd-template", help=f"Name of a template in {JD_DIR}/ (without .json)")
+    parser.add_argument("--workers", type=int, default=EXTRACT_WORKERS, help="Extraction processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="Files per extract/embed/insert batch")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <directory>/.ingest_checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    jd_text = load_jd(args)
+    checkpoint = args.checkpoint or os.path.join(args.directory, ".ingest_checkpoint")
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    init_db()
+    set_extract_workers(args.workers)
+
+    done = load_checkpoint(checkpoint)
+    all_files = find_resume_files(args.directory)
+    todo = [p for p in all_files if p not in done]
+    print(f"📂 {len(all_files)} resume files, {len(all_files) - len(todo)} already ingested, {len(todo)} to go",
+          file=sys.stderr)
+    if not todo:
+        return 0
+
+    print("🧠 Loading BERT model...", file=sys.stderr)
+    model = get_model()
+
+    timings = {}
+    counts = {'ok': 0, 'failed': 0, 'skipped': 0}
+    started = time.perf_counter()
+    try:
+        for start in range(0, len(todo), args.batch_size):
+            batch = todo[start:start + args.batch_size]
+            with ExitStack() as stack:
+                files = [stack.enter_context(open(os.path.join(args.directory, p), "rb")) for p in batch]
+                results = process_resume_files(files, jd_text, model, timings=timings)
+
+            parsed = [r for r in results if r['data'] is not None]
+            with stage_timer(timings, 'insert'):
+                insert_resumes_bulk([(r['file_name'], r['data']) for r in parsed])
+
+            finished = []
+            for rel_path, r in zip(batch, results):
+                if r['duplicate_of'] is not None:
+                    counts['skipped'] += 1
+                elif r['error']:
+                    counts['failed'] += 1
+                    print(f"❌ {rel_path}: {r['error']}", file=sys.stderr)
+                    continue
+                else:
+                    counts['ok'] += 1
+                finished.append(rel_path)
+            # Only recorded once the batch is committed, so a crash never loses files;
+            # failures (often a timeout or a restarted pool) are retried on the next run
+            append_checkpoint(checkpoint, finished)
+
+            processed = start + len(batch)
+            rate = processed / (time.perf_counter() - started)
+            print(f"[{processed}/{len(todo)}] ok={counts['ok']} failed={counts['failed']} "
+                  f"skipped={counts['skipped']} | {rate:.1f} files/sec", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("⏸️ Interrupted. Run the same command again to resume from the checkpoint.", file=sys.stderr)
+        return 130
+
+    total = time.perf_counter() - started
+    print(f"\n✅ Ingested {counts['ok']} resumes in {total:.1f}s ({len(todo) / total:.1f} files/sec overall)")
+    print(f"{'Stage':<10}{'Seconds':>10}{'Files/sec':>12}")
+    for stage in STAGES:
+        seconds = timings.get(stage, 0.0)
+        throughput = f"{len(todo) / seconds:.1f}" if seconds else "-"
+        print(f"{stage:<10}{seconds:>10.2f}{throughput:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
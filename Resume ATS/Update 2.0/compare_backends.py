@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+from utils.db import connect_db
+from utils.model_registry import EMBEDDING_BACKENDS, compare_backends
+
+# Checks an embedding backend before switching ATS_EMBEDDING_BACKEND:
+#   python compare_backends.py --limit 500
+#   python compare_backends.py --dir /data/sample_resumes --backends onnx-int8
+
+
+def load_sample_texts(args):
+    if args.dir:
+        from bulk_ingest import find_resume_files
+        from utils.extraction import extract_texts
+        paths = find_resume_files(args.dir)[:args.limit]
+        files = [open(os.path.join(args.dir, p), "rb") for p in paths]
+        try:
+            return [text for text, error in extract_texts(files) if text and text.strip()]
+        finally:
+            for f in files:
+                f.close()
+    with connect_db() as conn:
+        rows = conn.execute('''
+            SELECT COALESCE(experience, '') || ' ' || COALESCE(education, '') || ' ' || COALESCE(skills, '')
+            FROM resumes ORDER BY id DESC LIMIT ?
+        ''', (args.limit,)).fetchall()
+    return [row[0] for row in rows if row[0].strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare embedding backends against the torch baseline.")
+    parser.add_argument("--dir", help="folder of resume files to sample (default: resumes already in the database)")
+    parser.add_argument("--limit", type=int, default=256, help="number of resumes to encode")
+    parser.add_argument("--backends", nargs="+", choices=EMBEDDING_BACKENDS, default=EMBEDDING_BACKENDS)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    texts = load_sample_texts(args)
+    if len(texts) < 2:
+        print("❌ Need at least two resume texts to compare.", file=sys.stderr)
+        return 1
+
+    print(f"🧪 Encoding {len(texts)} resumes with {', '.join(args.backends)}...", file=sys.stderr)
+    report = compare_backends(texts, args.backends, args.batch_size)
+
+    print(f"{'Backend':<12}{'Texts/sec':>11}{'Speedup':>9}{'Mean cos':>10}{'Min cos':>9}{'NN agree':>10}")
+    for row in report:
+        print(f"{row['backend']:<12}{row['texts_per_sec']:>11.1f}{row['speedup']:>8.2f}x"
+              f"{row['mean_cosine']:>10.4f}{row['min_cosine']:>9.4f}{row['neighbour_agreement']:>9.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from utils.db import RESUME_STATUSES, init_db
+from utils.exporter import EXPORT_BATCH_SIZE, EXPORT_COLUMNS, EXPORT_FORMATS, export_resumes
+
+# Headless export for nightly dumps; same filters and streaming as Admin Tools:
+#   python export_resumes.py exports/resumes_$(date +%F).parquet --min-score 70
+#   python export_resumes.py - --columns id name email score > shortlist.csv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export resumes from the ATS database as CSV or Parquet.")
+    parser.add_argument("out", help="output file, or - for CSV on stdout")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="default: from the file extension, else csv")
+    parser.add_argument("--columns", nargs="+", default=EXPORT_COLUMNS, help="columns to export, in order")
+    parser.add_argument("--min-score", type=float, help="minimum match score (%%)")
+    parser.add_argument("--max-score", type=float, help="maximum match score (%%)")
+    parser.add_argument("--status", choices=RESUME_STATUSES)
+    parser.add_argument("--since", type=date.fromisoformat, help="uploaded on or after YYYY-MM-DD")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="rows fetched per batch")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.out.endswith(".parquet") else "csv")
+    if args.out == "-" and fmt != "csv":
+        parser.error("only CSV can be written to stdout")
+
+    filters = {'status': args.status}
+    if args.min_score is not None or args.max_score is not None:
+        filters['score_range'] = (
+            (args.min_score if args.min_score is not None else 0) / 100,
+            (args.max_score if args.max_score is not None else 100) / 100
+        )
+    if args.since:
+        filters['date_range'] = (args.since, date.today())
+
+    init_db()
+    start = time.perf_counter()
+    try:
+        if args.out == "-":
+            sys.stdout.reconfigure(newline="")
+            rows = export_resumes(sys.stdout, fmt, args.columns, filters, args.batch_size)
+        else:
+            if os.path.dirname(args.out):
+                os.makedirs(os.path.dirname(args.out), exist_ok=True)
+            # Written beside the target and renamed, so a nightly job never leaves a partial file
+            tmp_path = f"{args.out}.{os.getpid()}.tmp"
+            try:
+                rows = export_resumes(tmp_path, fmt, args.columns, filters, args.batch_size)
+                os.replace(tmp_path, args.out)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    print(f"✅ Exported {rows} resumes as {fmt} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
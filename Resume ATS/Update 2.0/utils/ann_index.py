@@ -0,0 +1,304 @@
+import atexit
+import os
+import threading
+import time
+import numpy as np
+from utils import db
+from utils.model_registry import EMBEDDING_MODEL_NAME
+
+# IVF-flat approximate nearest-neighbour index over the resume-level embeddings.
+# Vectors are grouped under k-means centroids; a query only scans the lists of
+# its closest nprobe centroids. Below ANN_MIN_TRAIN vectors the search is exact.
+# The index lives in memory once per process and is persisted next to the
+# database (resumes.ann.npz). On load it catches up with rows written by other
+# processes, so the file never has to be rebuilt from scratch.
+ANN_MIN_TRAIN = 2000
+ANN_NPROBE = 8
+ANN_KMEANS_ITERATIONS = 10
+ANN_SAMPLE_PER_LIST = 64
+ANN_SAVE_INTERVAL = 60  # seconds between saves while inserts keep arriving
+ANN_REBUILD_GROWTH = 4  # retrain once the index is this many times its trained size
+
+_lock = threading.RLock()
+_index = None
+_last_save = 0.0
+
+
+def index_path():
+    return os.path.splitext(db.DB_PATH)[0] + ".ann.npz"
+
+
+def _embedding_version():
+    # Imported late: parser imports db, which hooks inserts into this module
+    from utils.parser import EMBEDDING_VERSION
+    return EMBEDDING_VERSION
+
+
+def _empty_index(dim=0):
+    return {
+        'ids': np.empty(0, dtype=np.int64),
+        'vectors': np.empty((0, dim), dtype=np.float32),
+        'lists': np.empty(0, dtype=np.int32),
+        'centroids': np.empty((0, dim), dtype=np.float32),
+        'trained_size': 0,
+        'watermark': 0,
+        'model': EMBEDDING_MODEL_NAME,
+        'version': _embedding_version(),
+        'dirty': False,
+    }
+
+
+# =====================
+# Training (spherical k-means)
+# =====================
+def _assign(vectors, centroids, batch=50000):
+    if not len(centroids):
+        return np.zeros(len(vectors), dtype=np.int32)
+    lists = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), batch):
+        lists[start:start + batch] = (vectors[start:start + batch] @ centroids.T).argmax(axis=1)
+    return lists
+
+
+def train_centroids(vectors, seed=0):
+    rng = np.random.default_rng(seed)
+    nlist = int(np.clip(np.sqrt(len(vectors)), 16, 4096))
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), nlist * ANN_SAMPLE_PER_LIST), replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(ANN_KMEANS_ITERATIONS):
+        assignment = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        counts = np.bincount(assignment, minlength=nlist)
+        # Empty lists are reseeded from random sample points
+        empty = counts == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = (sums / np.where(norms, norms, 1)).astype(np.float32)
+    return centroids
+
+
+def _retrain(index):
+    if len(index['ids']) < ANN_MIN_TRAIN:
+        index['centroids'] = np.empty((0, index['vectors'].shape[1]), dtype=np.float32)
+        index['lists'] = np.zeros(len(index['ids']), dtype=np.int32)
+        index['trained_size'] = 0
+    else:
+        index['centroids'] = train_centroids(index['vectors'])
+        index['lists'] = _assign(index['vectors'], index['centroids'])
+        index['trained_size'] = len(index['ids'])
+    index['dirty'] = True
+
+
+# =====================
+# Persistence & Sync
+# =====================
+def _load_file(path):
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as f:
+        meta = f['meta']
+        index = {
+            'ids': f['ids'], 'vectors': f['vectors'], 'lists': f['lists'], 'centroids': f['centroids'],
+            'trained_size': int(meta[0]), 'watermark': int(meta[1]),
+            'model': str(f['model']), 'version': int(meta[2]), 'dirty': False,
+        }
+    if index['model'] != EMBEDDING_MODEL_NAME or index['version'] != _embedding_version():
+        return None  # built from other vectors; rebuilt from the database
+    return index
+
+
+def save_index():
+    global _last_save
+    with _lock:
+        if _index is None or not _index['dirty']:
+            return
+        path = index_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # Write-then-rename, so another process never loads a half-written file
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f, ids=_index['ids'], vectors=_index['vectors'], lists=_index['lists'],
+                centroids=_index['centroids'], model=np.array(_index['model']),
+                meta=np.array([_index['trained_size'], _index['watermark'], _index['version']], dtype=np.int64),
+            )
+        os.replace(tmp_path, path)
+        _index['dirty'] = False
+        _last_save = time.monotonic()
+
+atexit.register(save_index)
+
+
+def _stored_vectors(where, params=()):
+    with db.connect_db() as conn:
+        rows = conn.execute(f'''
+            SELECT id, embedding FROM resumes
+            WHERE embedding IS NOT NULL AND embedding_model = ? AND embedding_version = ? AND {where}
+            ORDER BY id
+        ''', (EMBEDDING_MODEL_NAME, _embedding_version(), *params)).fetchall()
+    ids = np.array([r[0] for r in rows], dtype=np.int64)
+    vectors = np.vstack([db.blob_to_embedding(r[1]) for r in rows]) if rows else None
+    return ids, vectors
+
+
+def sync_index(index):
+    # Catch up with the database: rows above the watermark are added; if the
+    # counts still disagree (deletes or backfilled vectors), the id sets are diffed
+    new_ids, new_vectors = _stored_vectors("id > ?", (index['watermark'],))
+    if len(new_ids):
+        _add(index, new_ids, new_vectors)
+    with db.connect_db() as conn:
+        stored = conn.execute('''
+            SELECT COUNT(*) FROM resumes
+            WHERE embedding IS NOT NULL AND embedding_model = ? AND embedding_version = ?
+        ''', (EMBEDDING_MODEL_NAME, _embedding_version())).fetchone()[0]
+    if stored != len(index['ids']):
+        with db.connect_db() as conn:
+            stored_ids = np.array([r[0] for r in conn.execute('''
+                SELECT id FROM resumes
+                WHERE embedding IS NOT NULL AND embedding_model = ? AND embedding_version = ?
+            ''', (EMBEDDING_MODEL_NAME, _embedding_version()))], dtype=np.int64)
+        _remove(index, index['ids'][~np.isin(index['ids'], stored_ids)])
+        missing = stored_ids[~np.isin(stored_ids, index['ids'])]
+        if len(missing):
+            ids, vectors = _stored_vectors(f"id IN ({', '.join(map(str, missing.tolist()))})")
+            _add(index, ids, vectors)
+    _maybe_retrain(index)
+
+
+def _stored_state():
+    # Answered from the partial embedding index, so it is cheap to check per search
+    with db.connect_db() as conn:
+        return conn.execute('''
+            SELECT COALESCE(MAX(id), 0), COUNT(*) FROM resumes
+            WHERE embedding IS NOT NULL AND embedding_model = ? AND embedding_version = ?
+        ''', (EMBEDDING_MODEL_NAME, _embedding_version())).fetchone()
+
+
+def get_index():
+    # Loaded once per process, then caught up whenever other processes have
+    # added or deleted vectors since (compared by max id and count)
+    global _index
+    with _lock:
+        if _index is None:
+            _index = _load_file(index_path()) or _empty_index()
+            sync_index(_index)
+            save_index()
+        elif _stored_state() != (_index['watermark'], len(_index['ids'])):
+            sync_index(_index)
+            _maybe_save()
+        return _index
+
+
+def rebuild_index():
+    global _index
+    with _lock:
+        _index = _empty_index()
+        sync_index(_index)
+        _retrain(_index)
+        save_index()
+        return _index
+
+
+# =====================
+# Incremental Updates
+# =====================
+def _add(index, ids, vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not index['vectors'].shape[1]:
+        index['vectors'] = np.empty((0, vectors.shape[1]), dtype=np.float32)
+    index['ids'] = np.concatenate([index['ids'], ids])
+    index['vectors'] = np.vstack([index['vectors'], vectors])
+    index['lists'] = np.concatenate([index['lists'], _assign(vectors, index['centroids'])])
+    index['watermark'] = max(index['watermark'], int(ids.max()))
+    index['dirty'] = True
+
+
+def _remove(index, ids):
+    if not len(ids):
+        return
+    keep = ~np.isin(index['ids'], ids)
+    for key in ('ids', 'vectors', 'lists'):
+        index[key] = index[key][keep]
+    index['dirty'] = True
+
+
+def _maybe_retrain(index):
+    if index['trained_size'] == 0 and len(index['ids']) >= ANN_MIN_TRAIN \
+            or index['trained_size'] and len(index['ids']) > ANN_REBUILD_GROWTH * index['trained_size']:
+        _retrain(index)
+
+
+def _maybe_save():
+    if time.monotonic() - _last_save >= ANN_SAVE_INTERVAL:
+        save_index()
+
+
+def add_to_index(ids, vectors, model_name, version):
+    # Insert hook: only updates an index this process already has loaded;
+    # otherwise the rows are picked up from the watermark on next load
+    with _lock:
+        if _index is None or model_name != _index['model'] or version != _index['version']:
+            return
+        _add(_index, np.asarray(ids, dtype=np.int64), np.vstack(vectors))
+        _maybe_retrain(_index)
+        _maybe_save()
+
+
+def remove_from_index(ids):
+    with _lock:
+        if _index is None:
+            return
+        _remove(_index, np.asarray(list(ids), dtype=np.int64))
+        save_index()
+
+
+def clear_index():
+    global _index
+    with _lock:
+        _index = None
+        if os.path.exists(index_path()):
+            os.remove(index_path())
+
+
+# =====================
+# Search
+# =====================
+def search_index(query, k=50, nprobe=ANN_NPROBE, index=None):
+    # Returns (resume_ids, scores), best first
+    index = index or get_index()
+    with _lock:
+        ids, vectors, lists, centroids = index['ids'], index['vectors'], index['lists'], index['centroids']
+    if not len(ids):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if len(centroids):
+        probes = np.argpartition(-(centroids @ query), min(nprobe, len(centroids)) - 1)[:nprobe]
+        rows = np.flatnonzero(np.isin(lists, probes))
+    else:
+        rows = np.arange(len(ids))
+    scores = vectors[rows] @ query
+    k = min(k, len(rows))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return ids[rows[top]], scores[top]
+
+
+def recall_at_k(k=50, queries=None, sample=100, nprobe=ANN_NPROBE, seed=0):
+    # Share of the exact top-k that the index returns, averaged over queries
+    # (by default a sample of the stored resume vectors themselves)
+    index = get_index()
+    if not len(index['ids']):
+        return None
+    if queries is None:
+        rng = np.random.default_rng(seed)
+        queries = index['vectors'][rng.choice(len(index['ids']), min(sample, len(index['ids'])), replace=False)]
+    hits = []
+    for query in queries:
+        exact = index['vectors'] @ query
+        kk = min(k, len(exact))
+        exact_ids = set(index['ids'][np.argpartition(-exact, kk - 1)[:kk]].tolist())
+        approx_ids = set(search_index(query, k, nprobe, index)[0].tolist())
+        hits.append(len(exact_ids & approx_ids) / kk)
+    return float(np.mean(hits))
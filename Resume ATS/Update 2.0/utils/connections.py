@@ -0,0 +1,33 @@
+import sqlite3
+import threading
+
+# Applied to every new connection. WAL lets readers run alongside a writer,
+# and NORMAL sync drops the per-commit fsync (safe in WAL mode).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,       # negative = KiB, i.e. a 64 MB page cache
+    'mmap_size': 268435456,     # 256 MB memory-mapped reads
+    'temp_store': 'MEMORY',
+}
+BUSY_TIMEOUT = 10  # seconds to wait on a locked database before failing
+
+_local = threading.local()
+
+def get_connection(path):
+    # One connection per (thread, database file), reused for the thread's lifetime
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        for pragma, value in SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma}={value}")
+        connections[path] = conn
+    return conn
+
+def close_connections():
+    for conn in getattr(_local, 'connections', {}).values():
+        conn.close()
+    _local.connections = {}
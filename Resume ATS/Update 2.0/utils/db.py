@@ -1,9 +1,48 @@
+import re
 import sqlite3
+import time
+import numpy as np
+from datetime import datetime, timedelta
+from utils.skills import canonical_skill
+from utils.connections import get_connection
+from utils import metrics, ann_index
 
 DB_PATH = "resumes.db"
 
+# Columns added after the original schema; applied to existing databases on init
+RESUME_EXTRA_COLUMNS = {
+    'embedding': 'BLOB',
+    'embedding_model': 'TEXT',
+    'embedding_version': 'INTEGER',
+    'content_hash': 'TEXT',
+    'upload_date': 'TEXT',
+    'last_updated': 'TEXT',
+    'resume_text': 'TEXT',
+}
+
+RESUME_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes(content_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_resumes_status ON resumes(status, id)",
+    "CREATE INDEX IF NOT EXISTS idx_resumes_score ON resumes(score)",
+    "CREATE INDEX IF NOT EXISTS idx_resumes_upload_date ON resumes(upload_date)",
+    "CREATE INDEX IF NOT EXISTS idx_resumes_embedding ON resumes(embedding_model, embedding_version) WHERE embedding IS NOT NULL",
+]
+
+RESUME_STATUSES = ["Pending", "Shortlisted", "Interviewed", "Rejected"]
+
 def connect_db():
-    return sqlite3.connect(DB_PATH)
+    return get_connection(DB_PATH)
+
+def fetch_dicts(conn, sql, params=()):
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return [dict(row) for row in cursor.execute(sql, params)]
+
+def add_missing_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
 
 def init_db():
     with connect_db() as conn:
@@ -22,20 +61,704 @@ def init_db():
                 notes TEXT
             )
         ''')
+        add_missing_columns(conn, 'resumes', RESUME_EXTRA_COLUMNS)
+        for statement in RESUME_INDEXES:
+            conn.execute(statement)
+        skills_created = init_skills(conn)
+        init_summary(conn, rebuild=skills_created)
+        init_fts(conn)
+        init_chunks(conn)
+        init_jd_scores(conn)
+
+RESUME_INSERT_COLUMNS = [
+    'file_name', 'name', 'email', 'phone', 'skills', 'experience', 'education', 'score',
+    'embedding', 'embedding_model', 'embedding_version', 'content_hash', 'upload_date', 'resume_text',
+]
+
+def _resume_row(file_name, data, upload_date):
+    embedding = data.get('embedding')
+    return (file_name, data['name'], data['email'], data['phone'], data['skills'], data['experience'], data['education'], data['score'],
+            embedding_to_blob(embedding) if embedding is not None else None,
+            data.get('embedding_model'), data.get('embedding_version'), data.get('content_hash'), upload_date,
+            data.get('resume_text'))
+
+def insert_resumes_bulk(items, before_commit=None):
+    # items: (file_name, data) pairs. One executemany in one transaction, so a
+    # batch costs a single commit instead of one per resume. Returns new ids.
+    # before_commit(conn, ids) runs inside that transaction, for callers that
+    # record the outcome alongside the rows.
+    items = list(items)
+    if not items:
+        return []
+    upload_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    start = time.perf_counter()
+    conn = connect_db()
+    with conn:
+        conn.executemany(f'''
+            INSERT INTO resumes ({', '.join(RESUME_INSERT_COLUMNS)})
+            VALUES ({', '.join('?' * len(RESUME_INSERT_COLUMNS))})
+        ''', [_resume_row(file_name, data, upload_date) for file_name, data in items])
+        # AUTOINCREMENT ids inside one write transaction are consecutive
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        ids = list(range(last_id - len(items) + 1, last_id + 1))
+        conn.executemany(
+            "INSERT OR REPLACE INTO resume_chunks VALUES (?, ?, ?, ?, ?)",
+            [_chunk_row(resume_id, data['chunk_embeddings'], data.get('embedding_model'), data.get('embedding_version'))
+             for resume_id, (_, data) in zip(ids, items) if data.get('chunk_embeddings') is not None]
+        )
+        if before_commit is not None:
+            before_commit(conn, ids)
+    # Recorded after the commit, so a metrics flush never joins this transaction
+    metrics.record('insert', time.perf_counter() - start, items=len(items))
+    embedded = [(resume_id, data) for resume_id, (_, data) in zip(ids, items) if data.get('embedding') is not None]
+    if embedded:
+        ann_index.add_to_index([i for i, _ in embedded], [data['embedding'] for _, data in embedded],
+                               embedded[0][1].get('embedding_model'), embedded[0][1].get('embedding_version'))
+    return ids
 
 def insert_resume(file_name, data):
-    with connect_db() as conn:
-        conn.execute('''
-            INSERT INTO resumes (file_name, name, email, phone, skills, experience, education, score)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (file_name, data['name'], data['email'], data['phone'], data['skills'], data['experience'], data['education'], data['score']))
-        conn.commit()
+    return insert_resumes_bulk([(file_name, data)])[0]
 
 def get_resume_count():
     with connect_db() as conn:
-        return conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+        return conn.execute("SELECT COALESCE(SUM(count), 0) FROM resume_status_counts").fetchone()[0]
 
 def get_avg_match_score():
     with connect_db() as conn:
-        row = conn.execute("SELECT AVG(score) FROM resumes").fetchone()
+        row = conn.execute("SELECT SUM(total) / SUM(count) FROM resume_score_buckets WHERE count > 0").fetchone()
         return row[0] if row else None
+
+
+# =====================
+# Candidate Skills
+# =====================
+# One row per (resume, skill), filled from resumes.skills by triggers so every
+# insert path (single, bulk, raw SQL) keeps it in step with the resumes table.
+SKILLS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS resume_skills (
+        resume_id INTEGER NOT NULL,
+        skill TEXT NOT NULL,
+        PRIMARY KEY (resume_id, skill)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_resume_skills_skill ON resume_skills(skill, resume_id);
+'''
+
+def _split_skills(id_expr, skills_expr, source=""):
+    # Splits a comma-joined skills string into (resume_id, skill) rows in SQL
+    return f"""
+        WITH RECURSIVE split(resume_id, item, rest) AS (
+            SELECT {id_expr}, '', COALESCE({skills_expr}, '') || ','{source}
+            UNION ALL
+            SELECT resume_id, substr(rest, 1, instr(rest, ',') - 1), substr(rest, instr(rest, ',') + 1)
+            FROM split WHERE rest <> ''
+        )
+        SELECT resume_id, lower(trim(item)) FROM split WHERE trim(item) <> ''"""
+
+SKILLS_TRIGGERS = {
+    'resumes_skills_insert': f"AFTER INSERT ON resumes BEGIN"
+                             f"\n        INSERT OR IGNORE INTO resume_skills (resume_id, skill)"
+                             f"{_split_skills('NEW.id', 'NEW.skills')};\n    END",
+    'resumes_skills_update': f"AFTER UPDATE OF skills ON resumes BEGIN"
+                             f"\n        DELETE FROM resume_skills WHERE resume_id = OLD.id;"
+                             f"\n        INSERT OR IGNORE INTO resume_skills (resume_id, skill)"
+                             f"{_split_skills('NEW.id', 'NEW.skills')};\n    END",
+    'resumes_skills_delete': "AFTER DELETE ON resumes BEGIN"
+                             "\n        DELETE FROM resume_skills WHERE resume_id = OLD.id;\n    END",
+}
+
+def ensure_trigger(conn, name, body):
+    # Recreate only when the definition changed, so init_db stays cheap
+    sql = f"CREATE TRIGGER {name} {body}"
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)).fetchone()
+    if row is None or row[0] != sql:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        conn.execute(sql)
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()[0] > 0
+
+def init_skills(conn):
+    created = not _table_exists(conn, 'resume_skills')
+    conn.executescript(SKILLS_TABLE)
+    for name, body in SKILLS_TRIGGERS.items():
+        ensure_trigger(conn, name, body)
+    if created:
+        conn.execute("INSERT OR IGNORE INTO resume_skills (resume_id, skill)"
+                     + _split_skills('id', 'skills', source=" FROM resumes"))
+    return created
+
+def skill_filter_clause(skills):
+    # Resumes having ALL the given skills, answered from the skill index
+    skills = sorted({canonical_skill(s) for s in skills if s.strip()})
+    placeholders = ', '.join('?' * len(skills))
+    return (f"id IN (SELECT resume_id FROM resume_skills WHERE skill IN ({placeholders}) "
+            f"GROUP BY resume_id HAVING COUNT(*) = ?)"), [*skills, len(skills)]
+
+def find_resumes_with_skills(skills):
+    clause, params = skill_filter_clause(skills)
+    with connect_db() as conn:
+        return [row[0] for row in conn.execute(f"SELECT id FROM resumes WHERE {clause} ORDER BY id", params)]
+
+def get_missing_skills(resume_id, required_skills):
+    required = {canonical_skill(s) for s in required_skills if s.strip()}
+    if not required:
+        return set()
+    placeholders = ', '.join('?' * len(required))
+    with connect_db() as conn:
+        found = {row[0] for row in conn.execute(
+            f"SELECT skill FROM resume_skills WHERE resume_id = ? AND skill IN ({placeholders})",
+            (resume_id, *required)
+        )}
+    return required - found
+
+
+# =====================
+# Dashboard Summary
+# =====================
+# Small aggregate tables kept current by triggers, so the dashboard and home
+# page read a few hundred rows instead of the whole resumes table.
+SCORE_BUCKETS = 10
+
+SUMMARY_TABLES = '''
+    CREATE TABLE IF NOT EXISTS resume_status_counts (
+        status TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS resume_score_buckets (
+        bucket INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0,
+        total REAL NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS resume_skill_counts (
+        skill TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    );
+'''
+
+def _bucket_expr(score):
+    return f"MAX(0, MIN({SCORE_BUCKETS - 1}, CAST({score} * {SCORE_BUCKETS} AS INTEGER)))"
+
+def _status_delta(ref, delta):
+    return f'''
+        INSERT INTO resume_status_counts (status, count) VALUES (COALESCE({ref}.status, 'Pending'), {delta})
+        ON CONFLICT(status) DO UPDATE SET count = count + excluded.count;'''
+
+def _score_delta(ref, delta):
+    return f'''
+        INSERT INTO resume_score_buckets (bucket, count, total)
+        SELECT {_bucket_expr(f'{ref}.score')}, {delta}, {delta} * {ref}.score WHERE {ref}.score IS NOT NULL
+        ON CONFLICT(bucket) DO UPDATE SET count = count + excluded.count, total = total + excluded.total;'''
+
+def _skill_delta(ref, delta):
+    return f'''
+        INSERT INTO resume_skill_counts (skill, count) VALUES ({ref}.skill, {delta})
+        ON CONFLICT(skill) DO UPDATE SET count = count + excluded.count;'''
+
+SUMMARY_TRIGGERS = {
+    'resumes_summary_insert': f"AFTER INSERT ON resumes BEGIN"
+                              f"{_status_delta('NEW', 1)}{_score_delta('NEW', 1)}\n    END",
+    'resumes_summary_delete': f"AFTER DELETE ON resumes BEGIN"
+                              f"{_status_delta('OLD', -1)}{_score_delta('OLD', -1)}\n    END",
+    'resumes_summary_status': f"AFTER UPDATE OF status ON resumes BEGIN"
+                              f"{_status_delta('OLD', -1)}{_status_delta('NEW', 1)}\n    END",
+    'resumes_summary_score': f"AFTER UPDATE OF score ON resumes BEGIN"
+                             f"{_score_delta('OLD', -1)}{_score_delta('NEW', 1)}\n    END",
+    'resume_skills_summary_insert': f"AFTER INSERT ON resume_skills BEGIN{_skill_delta('NEW', 1)}\n    END",
+    'resume_skills_summary_delete': f"AFTER DELETE ON resume_skills BEGIN{_skill_delta('OLD', -1)}"
+                                    f"\n        DELETE FROM resume_skill_counts WHERE skill = OLD.skill AND count <= 0;\n    END",
+}
+
+def init_summary(conn, rebuild=False):
+    created = not _table_exists(conn, 'resume_status_counts')
+    conn.executescript(SUMMARY_TABLES)
+    for name, body in SUMMARY_TRIGGERS.items():
+        ensure_trigger(conn, name, body)
+    if created or rebuild:
+        rebuild_summary(conn)
+
+def rebuild_summary(conn):
+    # Full recompute; only needed when the summary tables are first created
+    conn.execute("DELETE FROM resume_status_counts")
+    conn.execute('''
+        INSERT INTO resume_status_counts (status, count)
+        SELECT COALESCE(status, 'Pending'), COUNT(*) FROM resumes GROUP BY 1
+    ''')
+    conn.execute("DELETE FROM resume_score_buckets")
+    conn.execute(f'''
+        INSERT INTO resume_score_buckets (bucket, count, total)
+        SELECT {_bucket_expr('score')}, COUNT(*), SUM(score) FROM resumes WHERE score IS NOT NULL GROUP BY 1
+    ''')
+    conn.execute("DELETE FROM resume_skill_counts")
+    conn.execute('''
+        INSERT INTO resume_skill_counts (skill, count)
+        SELECT skill, COUNT(*) FROM resume_skills GROUP BY skill
+    ''')
+
+def get_dashboard_summary(top_skills=10):
+    with connect_db() as conn:
+        statuses = conn.execute(
+            "SELECT status, count FROM resume_status_counts WHERE count > 0 ORDER BY count DESC"
+        ).fetchall()
+        buckets = dict(conn.execute("SELECT bucket, count FROM resume_score_buckets").fetchall())
+        scored, total = conn.execute("SELECT SUM(count), SUM(total) FROM resume_score_buckets").fetchone()
+        skills = conn.execute(
+            "SELECT skill, count FROM resume_skill_counts ORDER BY count DESC LIMIT ?", (top_skills,)
+        ).fetchall()
+    return {
+        'total': sum(count for _, count in statuses),
+        'avg_score': total / scored if scored else None,
+        'status_counts': statuses,
+        'score_buckets': [(b / SCORE_BUCKETS, buckets.get(b, 0)) for b in range(SCORE_BUCKETS)],
+        'top_skills': skills,
+    }
+
+def find_resumes_by_hash(content_hashes):
+    found = {}
+    with connect_db() as conn:
+        for chunk in _chunked(set(content_hashes)):
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT content_hash, MIN(id) FROM resumes WHERE content_hash IN ({placeholders}) GROUP BY content_hash",
+                chunk
+            )
+            found.update(rows)
+    return found
+
+
+
+# =====================
+# Resume Search (Review page)
+# =====================
+RESUME_CARD_COLUMNS = ['id', 'name', 'email', 'score', 'status', 'upload_date', 'last_updated']
+
+def resume_filter_clause(name=None, skill=None, status=None, score_range=None, date_range=None):
+    # Filters become a parameterized WHERE clause; score range is in 0-1 units,
+    # date range is a pair of datetime.date (inclusive)
+    clauses, params = [], []
+    if name:
+        clauses.append("name LIKE ?")
+        params.append(f"%{name}%")
+    if skill:
+        clause, skill_params = skill_filter_clause(skill.split(","))
+        clauses.append(clause)
+        params.extend(skill_params)
+    if status and status != "All":
+        clauses.append("status = ?")
+        params.append(status)
+    if score_range:
+        clauses.append("score BETWEEN ? AND ?")
+        params.extend(score_range)
+    if date_range:
+        clauses.append("upload_date >= ? AND upload_date < ?")
+        params.extend([date_range[0].isoformat(), (date_range[1] + timedelta(days=1)).isoformat()])
+    return (" AND ".join(clauses) or "1"), params
+
+def search_resumes(filters=None, after=None, limit=20):
+    # Keyset pagination: `after` is the cursor of the last row shown (see
+    # resume_cursor). Plain filters page by id; full-text queries page by
+    # (BM25 rank, id) so the best matches come first.
+    filters = dict(filters or {})
+    text = (filters.pop('text', None) or "").strip()
+    where, params = resume_filter_clause(**filters)
+    columns = ', '.join(f"resumes.{c}" for c in RESUME_CARD_COLUMNS)
+
+    with connect_db() as conn:
+        if text and fts_available(conn):
+            if after is not None:
+                where += " AND (f.rank > ? OR (f.rank = ? AND resumes.id > ?))"
+                params.extend([after[0], after[0], after[1]])
+            return fetch_dicts(conn, f'''
+                SELECT {columns}, f.rank FROM resumes
+                JOIN (
+                    SELECT rowid, bm25(resumes_fts, {FTS_WEIGHTS}) AS rank
+                    FROM resumes_fts WHERE resumes_fts MATCH ?
+                ) f ON f.rowid = resumes.id
+                WHERE {where} ORDER BY f.rank, resumes.id LIMIT ?
+            ''', (build_fts_query(text), *params, limit))
+        else:
+            if text:
+                # SQLite built without FTS5: fall back to a substring scan
+                where += " AND (" + " OR ".join(f"{c} LIKE ?" for c in FTS_COLUMNS) + ")"
+                params.extend([f"%{text}%"] * len(FTS_COLUMNS))
+            if after is not None:
+                where += " AND resumes.id > ?"
+                params.append(after)
+            return fetch_dicts(conn, f'''
+                SELECT {columns} FROM resumes
+                WHERE {where} ORDER BY resumes.id LIMIT ?
+            ''', (*params, limit))
+
+def resume_cursor(row):
+    return (row['rank'], row['id']) if 'rank' in row else row['id']
+
+def get_resume_filter_bounds():
+    # A lone MIN/MAX on an indexed column is an index lookup, not a scan
+    with connect_db() as conn:
+        min_score, max_score, min_date, max_date = conn.execute('''
+            SELECT (SELECT MIN(score) FROM resumes), (SELECT MAX(score) FROM resumes),
+                   (SELECT MIN(upload_date) FROM resumes), (SELECT MAX(upload_date) FROM resumes)
+        ''').fetchone()
+    return {'score': (min_score, max_score), 'upload_date': (min_date, max_date)}
+
+def get_resume_details(resume_id):
+    with connect_db() as conn:
+        rows = fetch_dicts(conn, "SELECT skills, experience, education, notes FROM resumes WHERE id = ?", (resume_id,))
+    return rows[0] if rows else None
+
+def get_resume_cards(resume_ids):
+    # Light rows for a known set of ids, e.g. index search results
+    cards = []
+    with connect_db() as conn:
+        for chunk in _chunked(resume_ids):
+            cards += fetch_dicts(conn, f'''
+                SELECT id, name, email, file_name, status FROM resumes
+                WHERE id IN ({', '.join('?' * len(chunk))})
+            ''', chunk)
+    return cards
+
+def update_resume_status(resume_id, status, notes):
+    with connect_db() as conn:
+        conn.execute(
+            "UPDATE resumes SET status=?, notes=?, last_updated=? WHERE id=?",
+            (status, notes, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), resume_id)
+        )
+        conn.commit()
+
+def delete_resumes(resume_ids):
+    # Triggers clean up skills, chunks, scores and the search index tables
+    resume_ids = list(resume_ids)
+    with connect_db() as conn:
+        for chunk in _chunked(resume_ids):
+            conn.execute(f"DELETE FROM resumes WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+        conn.commit()
+    ann_index.remove_from_index(resume_ids)
+
+def delete_all_resumes():
+    with connect_db() as conn:
+        conn.execute("DELETE FROM resumes")
+        conn.commit()
+    ann_index.clear_index()
+
+
+
+# =====================
+# Full-Text Search
+# =====================
+# External-content FTS5 index over resumes, kept in sync by triggers
+FTS_COLUMNS = ['name', 'skills', 'experience', 'education', 'notes']
+# BM25 column weights, in FTS_COLUMNS order: a hit in the name or skills counts most
+FTS_WEIGHTS = "10.0, 5.0, 1.0, 1.0, 1.0"
+
+FTS_TABLE = f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts USING fts5(
+        {', '.join(FTS_COLUMNS)},
+        content='resumes', content_rowid='id', prefix='2 3'
+    )
+'''
+
+def _fts_values(ref):
+    return ', '.join(f"{ref}.{c}" for c in FTS_COLUMNS)
+
+FTS_TRIGGERS = {
+    'resumes_fts_insert': f"AFTER INSERT ON resumes BEGIN"
+                          f"\n        INSERT INTO resumes_fts (rowid, {', '.join(FTS_COLUMNS)})"
+                          f" VALUES (NEW.id, {_fts_values('NEW')});\n    END",
+    'resumes_fts_delete': f"AFTER DELETE ON resumes BEGIN"
+                          f"\n        INSERT INTO resumes_fts (resumes_fts, rowid, {', '.join(FTS_COLUMNS)})"
+                          f" VALUES ('delete', OLD.id, {_fts_values('OLD')});\n    END",
+    'resumes_fts_update': f"AFTER UPDATE OF {', '.join(FTS_COLUMNS)} ON resumes BEGIN"
+                          f"\n        INSERT INTO resumes_fts (resumes_fts, rowid, {', '.join(FTS_COLUMNS)})"
+                          f" VALUES ('delete', OLD.id, {_fts_values('OLD')});"
+                          f"\n        INSERT INTO resumes_fts (rowid, {', '.join(FTS_COLUMNS)})"
+                          f" VALUES (NEW.id, {_fts_values('NEW')});\n    END",
+}
+
+def init_fts(conn):
+    created = not _table_exists(conn, 'resumes_fts')
+    try:
+        conn.execute(FTS_TABLE)
+    except sqlite3.OperationalError:
+        # SQLite compiled without FTS5; search_resumes falls back to LIKE
+        return
+    for name, body in FTS_TRIGGERS.items():
+        ensure_trigger(conn, name, body)
+    if created:
+        conn.execute("INSERT INTO resumes_fts (resumes_fts) VALUES ('rebuild')")
+
+def fts_available(conn):
+    return _table_exists(conn, 'resumes_fts')
+
+def build_fts_query(text):
+    # User syntax: "exact phrase", prefix*, other words are ANDed. Every term is
+    # quoted so stray FTS operators in the input can never raise a syntax error.
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', text):
+        if phrase:
+            terms.append('"' + phrase.replace('"', '""') + '"')
+        else:
+            prefix = word.endswith('*')
+            word = word.rstrip('*').replace('"', '""')
+            if word:
+                terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms) or '""'
+
+
+# =====================
+# Resume Embeddings
+# =====================
+def embedding_to_blob(embedding):
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+def blob_to_embedding(blob):
+    return np.frombuffer(blob, dtype=np.float32)
+
+def _chunked(items, size=500):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def load_resume_embeddings(resume_ids, model_name, version):
+    # Only embeddings produced by the same model and pipeline version are reusable
+    embeddings = {}
+    with connect_db() as conn:
+        for chunk in _chunked(resume_ids):
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(f'''
+                SELECT id, embedding FROM resumes
+                WHERE id IN ({placeholders}) AND embedding IS NOT NULL
+                  AND embedding_model = ? AND embedding_version = ?
+            ''', (*chunk, model_name, version))
+            for resume_id, blob in rows:
+                embeddings[resume_id] = blob_to_embedding(blob)
+    return embeddings
+
+def save_resume_embeddings(items, model_name, version):
+    with connect_db() as conn:
+        conn.executemany(
+            "UPDATE resumes SET embedding=?, embedding_model=?, embedding_version=? WHERE id=?",
+            [(embedding_to_blob(vec), model_name, version, resume_id) for resume_id, vec in items]
+        )
+        conn.commit()
+
+# Chunk vectors per resume, stored as one (chunk_count, dim) float32 matrix
+CHUNKS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS resume_chunks (
+        resume_id INTEGER PRIMARY KEY,
+        chunk_count INTEGER NOT NULL,
+        embeddings BLOB NOT NULL,
+        embedding_model TEXT,
+        embedding_version INTEGER
+    )
+'''
+
+CHUNKS_TRIGGERS = {
+    'resumes_chunks_delete': "AFTER DELETE ON resumes BEGIN"
+                             "\n        DELETE FROM resume_chunks WHERE resume_id = OLD.id;\n    END",
+}
+
+def init_chunks(conn):
+    conn.execute(CHUNKS_TABLE)
+    for name, body in CHUNKS_TRIGGERS.items():
+        ensure_trigger(conn, name, body)
+
+def _chunk_row(resume_id, chunk_vectors, model_name, version):
+    return (resume_id, len(chunk_vectors), embedding_to_blob(chunk_vectors), model_name, version)
+
+def load_resume_chunks(resume_ids, model_name, version):
+    chunks = {}
+    with connect_db() as conn:
+        for chunk in _chunked(resume_ids):
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(f'''
+                SELECT resume_id, chunk_count, embeddings FROM resume_chunks
+                WHERE resume_id IN ({placeholders}) AND embedding_model = ? AND embedding_version = ?
+            ''', (*chunk, model_name, version))
+            for resume_id, count, blob in rows:
+                chunks[resume_id] = blob_to_embedding(blob).reshape(count, -1)
+    return chunks
+
+def save_resume_chunks(items, model_name, version):
+    with connect_db() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO resume_chunks VALUES (?, ?, ?, ?, ?)",
+            [_chunk_row(resume_id, vectors, model_name, version) for resume_id, vectors in items]
+        )
+        conn.commit()
+
+def get_resume_texts(resume_ids):
+    # Full extracted text where it was stored; older rows only have their sections
+    texts = {}
+    with connect_db() as conn:
+        for chunk in _chunked(resume_ids):
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(f'''
+                SELECT id, COALESCE(resume_text, COALESCE(experience, '') || ' ' || COALESCE(education, '')
+                                                  || ' ' || COALESCE(skills, ''))
+                FROM resumes WHERE id IN ({placeholders})
+            ''', chunk)
+            texts.update(rows)
+    return texts
+
+
+# =====================
+# JD Templates & Re-scoring
+# =====================
+# One row per JD template: its current text, skills and embedding (computed once
+# when the template is saved or its file changes), plus the key it was last
+# scored under (text hash, model, vector version, pooling) and a watermark:
+# every resume with id <= scored_through has a score for it
+JD_SCORE_TABLES = '''
+    CREATE TABLE IF NOT EXISTS jd_templates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        content_hash TEXT,
+        scored_through INTEGER NOT NULL DEFAULT 0,
+        scored_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS resume_jd_scores (
+        resume_id INTEGER NOT NULL,
+        jd_id INTEGER NOT NULL,
+        score REAL,
+        skill_overlap REAL,
+        PRIMARY KEY (resume_id, jd_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_resume_jd_scores_rank ON resume_jd_scores(jd_id, score DESC);
+'''
+
+JD_TEMPLATE_EXTRA_COLUMNS = {
+    'jd_text': 'TEXT',
+    'skills': 'TEXT',
+    'embedding': 'BLOB',
+    'embedding_model': 'TEXT',
+    'embedding_version': 'INTEGER',
+    'file_mtime': 'REAL',
+    'updated_at': 'TEXT',
+    'scored_hash': 'TEXT',
+}
+
+JD_SCORE_TRIGGERS = {
+    'resumes_jd_scores_delete': "AFTER DELETE ON resumes BEGIN"
+                                "\n        DELETE FROM resume_jd_scores WHERE resume_id = OLD.id;\n    END",
+}
+
+def init_jd_scores(conn):
+    conn.executescript(JD_SCORE_TABLES)
+    add_missing_columns(conn, 'jd_templates', JD_TEMPLATE_EXTRA_COLUMNS)
+    for name, body in JD_SCORE_TRIGGERS.items():
+        ensure_trigger(conn, name, body)
+
+def register_jd_template(name, content_hash):
+    # Returns (jd_id, scored_through). An edited template drops its old scores
+    # and starts over, an unchanged one resumes after its watermark.
+    conn = connect_db()
+    with conn:
+        row = conn.execute("SELECT id, scored_hash, scored_through FROM jd_templates WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            cursor = conn.execute("INSERT INTO jd_templates (name, scored_hash) VALUES (?, ?)", (name, content_hash))
+            return cursor.lastrowid, 0
+        jd_id, scored_hash, scored_through = row
+        if scored_hash != content_hash:
+            conn.execute("DELETE FROM resume_jd_scores WHERE jd_id = ?", (jd_id,))
+            conn.execute("UPDATE jd_templates SET scored_hash = ?, scored_through = 0 WHERE id = ?",
+                         (content_hash, jd_id))
+            scored_through = 0
+    return jd_id, scored_through
+
+def get_resume_ids_after(resume_id):
+    with connect_db() as conn:
+        return [row[0] for row in conn.execute("SELECT id FROM resumes WHERE id > ? ORDER BY id", (resume_id,))]
+
+def save_jd_scores(jd_id, rows, scored_through):
+    # rows: (resume_id, score, skill_overlap); scores and watermark move together
+    conn = connect_db()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO resume_jd_scores (resume_id, jd_id, score, skill_overlap) VALUES (?, ?, ?, ?)",
+            [(resume_id, jd_id, score, overlap) for resume_id, score, overlap in rows]
+        )
+        conn.execute("UPDATE jd_templates SET scored_through = ?, scored_at = ? WHERE id = ?",
+                     (scored_through, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), jd_id))
+
+def get_jd_template_state():
+    # {name: (content_hash, file_mtime)} for change detection against the files
+    with connect_db() as conn:
+        return {name: (content_hash, mtime) for name, content_hash, mtime in conn.execute(
+            "SELECT name, content_hash, file_mtime FROM jd_templates WHERE jd_text IS NOT NULL"
+        )}
+
+def upsert_jd_template(name, jd_text, content_hash, skills, file_mtime, embedding=None, model_name=None, version=None):
+    conn = connect_db()
+    with conn:
+        conn.execute('''
+            INSERT INTO jd_templates (name, jd_text, content_hash, skills, file_mtime, updated_at,
+                                      embedding, embedding_model, embedding_version)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                jd_text = excluded.jd_text, content_hash = excluded.content_hash, skills = excluded.skills,
+                file_mtime = excluded.file_mtime, updated_at = excluded.updated_at, embedding = excluded.embedding,
+                embedding_model = excluded.embedding_model, embedding_version = excluded.embedding_version
+        ''', (name, jd_text, content_hash, ', '.join(skills), file_mtime, datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+              embedding_to_blob(embedding) if embedding is not None else None, model_name, version))
+
+def touch_jd_template(name, file_mtime):
+    # File re-saved with identical text: nothing to recompute
+    with connect_db() as conn:
+        conn.execute("UPDATE jd_templates SET file_mtime = ? WHERE name = ?", (file_mtime, name))
+        conn.commit()
+
+def delete_jd_templates(names):
+    names = list(names)
+    conn = connect_db()
+    with conn:
+        for chunk in _chunked(names):
+            placeholders = ', '.join('?' * len(chunk))
+            conn.execute(f"DELETE FROM resume_jd_scores WHERE jd_id IN "
+                         f"(SELECT id FROM jd_templates WHERE name IN ({placeholders}))", chunk)
+            conn.execute(f"DELETE FROM jd_templates WHERE name IN ({placeholders})", chunk)
+
+def list_jd_templates():
+    # Metadata only; the text and embedding stay on disk until asked for
+    with connect_db() as conn:
+        return fetch_dicts(conn, '''
+            SELECT id, name, content_hash, skills, updated_at, scored_at, scored_through
+            FROM jd_templates WHERE jd_text IS NOT NULL ORDER BY name
+        ''')
+
+def get_jd_template_text(name):
+    with connect_db() as conn:
+        row = conn.execute("SELECT jd_text FROM jd_templates WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+def load_jd_template_embeddings(names, model_name, version):
+    embeddings = {}
+    with connect_db() as conn:
+        for chunk in _chunked(names):
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(f'''
+                SELECT name, embedding FROM jd_templates
+                WHERE name IN ({placeholders}) AND embedding IS NOT NULL
+                  AND embedding_model = ? AND embedding_version = ?
+            ''', (*chunk, model_name, version))
+            for name, blob in rows:
+                embeddings[name] = blob_to_embedding(blob)
+    return embeddings
+
+def save_jd_template_embeddings(items, model_name, version):
+    with connect_db() as conn:
+        conn.executemany(
+            "UPDATE jd_templates SET embedding = ?, embedding_model = ?, embedding_version = ? WHERE name = ?",
+            [(embedding_to_blob(vec), model_name, version, name) for name, vec in items]
+        )
+        conn.commit()
+
+def get_jd_ranking(jd_id, limit=20):
+    # Top candidates for a template straight off the (jd_id, score) index
+    with connect_db() as conn:
+        return fetch_dicts(conn, '''
+            SELECT r.id, r.name, r.email, r.file_name, r.status, s.score, s.skill_overlap
+            FROM resume_jd_scores s JOIN resumes r ON r.id = s.resume_id
+            WHERE s.jd_id = ?
+            ORDER BY s.score DESC LIMIT ?
+        ''', (jd_id, limit))
@@ -0,0 +1,147 @@
+import csv
+import io
+import os
+import tempfile
+import time
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.db import connect_db, resume_filter_clause
+
+# Streams resumes out of SQLite in fixed-size batches, so an export never holds
+# more than EXPORT_BATCH_SIZE rows in memory. Filters are the Review page's
+# (resume_filter_clause) and run in SQL; scores are written as percentages.
+EXPORT_BATCH_SIZE = 2000
+EXPORT_FORMATS = ['csv', 'parquet']
+EXPORT_COLUMNS = [
+    'id', 'file_name', 'name', 'email', 'phone', 'skills', 'experience', 'education',
+    'score', 'status', 'notes', 'upload_date', 'last_updated'
+]
+
+SQLITE_TO_ARROW = {'INTEGER': pa.int64(), 'REAL': pa.float64(), 'TEXT': pa.string()}
+
+# Files prepared for a download button; sessions that end or navigate away
+# never clean up after themselves, so anything older than this is pruned
+EXPORT_DIR = os.environ.get("ATS_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "ats_exports"))
+EXPORT_MAX_AGE = 3600  # seconds
+
+
+def exportable_columns():
+    # Every non-BLOB column, in table order (embeddings are never exported)
+    with connect_db() as conn:
+        return {
+            row[1]: SQLITE_TO_ARROW.get(row[2].upper(), pa.string())
+            for row in conn.execute("PRAGMA table_info(resumes)")
+            if row[2].upper() != 'BLOB'
+        }
+
+
+def _select_columns(columns):
+    available = exportable_columns()
+    columns = list(columns or [c for c in EXPORT_COLUMNS if c in available])
+    unknown = [c for c in columns if c not in available]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    return columns, pa.schema([(c, available[c]) for c in columns])
+
+
+def iter_resume_batches(columns=None, filters=None, batch_size=EXPORT_BATCH_SIZE):
+    # Yields lists of row tuples straight from a cursor, in id order
+    columns, _ = _select_columns(columns)
+    where, params = resume_filter_clause(**(filters or {}))
+    select = ', '.join("score * 100 AS score" if c == 'score' else c for c in columns)
+    with connect_db() as conn:
+        cursor = conn.execute(f"SELECT {select} FROM resumes WHERE {where} ORDER BY id", params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+
+def count_resumes(filters=None):
+    where, params = resume_filter_clause(**(filters or {}))
+    with connect_db() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM resumes WHERE {where}", params).fetchone()[0]
+
+
+# =====================
+# Writers
+# =====================
+def write_csv(out, columns=None, filters=None, batch_size=EXPORT_BATCH_SIZE):
+    # `out` is a text file opened with newline=""; returns the number of rows written
+    columns, _ = _select_columns(columns)
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    written = 0
+    for rows in iter_resume_batches(columns, filters, batch_size):
+        writer.writerows(rows)
+        written += len(rows)
+    return written
+
+
+def write_parquet(out, columns=None, filters=None, batch_size=EXPORT_BATCH_SIZE, compression="zstd"):
+    # One row group per batch; `out` is a path or a binary file
+    columns, schema = _select_columns(columns)
+    written = 0
+    with pq.ParquetWriter(out, schema, compression=compression) as writer:
+        for rows in iter_resume_batches(columns, filters, batch_size):
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)],
+                schema=schema
+            ))
+            written += len(rows)
+    return written
+
+
+def export_resumes(out, fmt="csv", columns=None, filters=None, batch_size=EXPORT_BATCH_SIZE):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet":
+        return write_parquet(out, columns, filters, batch_size)
+    if isinstance(out, str):
+        with open(out, "w", encoding="utf-8", newline="") as f:
+            return write_csv(f, columns, filters, batch_size)
+    return write_csv(out, columns, filters, batch_size)
+
+
+# =====================
+# Prepared Download Files
+# =====================
+def prune_exports(max_age=EXPORT_MAX_AGE):
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    cutoff = time.time() - max_age
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # pruned by another session at the same time
+
+
+def prepare_export(fmt="csv", columns=None, filters=None, batch_size=EXPORT_BATCH_SIZE):
+    # Returns (path, rows) of a new file under EXPORT_DIR
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=EXPORT_DIR, suffix=f".{fmt}", delete=False) as f:
+        try:
+            rows = export_to_file(f, fmt, columns, filters, batch_size)
+        except Exception:
+            f.close()
+            os.remove(f.name)
+            raise
+    return f.name, rows
+
+
+def export_to_file(fileobj, fmt="csv", columns=None, filters=None, batch_size=EXPORT_BATCH_SIZE):
+    # Writes into an open binary file (e.g. a temp file for a download button)
+    if fmt == "csv":
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+        try:
+            return export_resumes(text, fmt, columns, filters, batch_size)
+        finally:
+            text.flush()
+            text.detach()
+    return export_resumes(fileobj, fmt, columns, filters, batch_size)
@@ -0,0 +1,233 @@
+import io
+import os
+import hashlib
+import itertools
+import queue
+import signal
+import threading
+import time
+import multiprocessing
+import docx2txt
+from pdfminer.high_level import extract_text as extract_pdf_text
+from utils.ocr import ocr_image_bytes, ocr_pdf_bytes
+from utils import metrics
+
+# Kept free of model/torch imports so pool workers start quickly
+EXTRACT_WORKERS = int(os.environ.get("ATS_EXTRACT_WORKERS", os.cpu_count() or 1))
+EXTRACT_TIMEOUT = float(os.environ.get("ATS_EXTRACT_TIMEOUT", 120))
+# A PDF with less text than this has no real text layer (a scan) and is OCR'd
+MIN_PDF_TEXT_CHARS = 50
+
+
+# =====================
+# Text Extraction Handlers
+# =====================
+def _extract_pdf(file):
+    text = extract_pdf_text(file)
+    if len(text.strip()) >= MIN_PDF_TEXT_CHARS:
+        return text, 'pdfminer'
+    try:
+        ocr_text = ocr_pdf_bytes(read_file_bytes(file))
+    except TimeoutError:
+        raise  # the per-file alarm: the file as a whole has run out of time
+    except Exception:
+        # OCR is only a fallback; a scan it can't read still keeps its text layer
+        return text, 'pdfminer'
+    return (ocr_text, 'tesseract-pdf') if ocr_text.strip() else (text, 'pdfminer')
+
+def extract_text_from_pdf(file):
+    return _extract_pdf(file)[0]
+
+def extract_text_from_docx(file):
+    return docx2txt.process(file)
+
+def extract_text_from_image(file):
+    return ocr_image_bytes(read_file_bytes(file))
+
+def extract_text_with_source(file):
+    # (text, extractor used), so metrics can tell pdfminer from OCR
+    file_type = file.name.split('.')[-1].lower()
+    if file_type == "pdf":
+        return _extract_pdf(file)
+    elif file_type == "docx":
+        return extract_text_from_docx(file), 'docx2txt'
+    else:
+        return extract_text_from_image(file), 'tesseract'
+
+def extract_text(file):
+    return extract_text_with_source(file)[0]
+
+def read_file_bytes(file):
+    if hasattr(file, 'getvalue'):
+        return file.getvalue()
+    file.seek(0)
+    return file.read()
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# =====================
+# Extraction Worker Pool
+# =====================
+# Workers report when they actually start a file, so a file's timeout never
+# includes time spent queued behind other batches on the shared pool.
+_pool = None
+_pool_lock = threading.Lock()
+_pool_tasks = {}     # pool -> tasks submitted to it and not yet collected
+_retired = {}        # pool -> when it was closed to new batches after a stuck file
+_start_queue = None  # (task id, start time) from the workers
+_started = {}        # task id -> start time, None while still queued
+_task_ids = itertools.count()
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("extraction timed out")
+
+def _init_worker(start_queue):
+    global _start_queue
+    _start_queue = start_queue
+
+def _extract_worker(file_name, data, timeout, task_id=None):
+    # Runs in a pool process; the alarm bounds a single file where SIGALRM exists.
+    # Signals can only be armed from the main thread, so inline extraction from a
+    # Streamlit script or job thread runs without the per-file alarm.
+    if task_id is not None:
+        _start_queue.put((task_id, time.time()))
+    use_alarm = hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        buffer = io.BytesIO(data)
+        buffer.name = file_name
+        start = time.perf_counter()
+        text, extractor = extract_text_with_source(buffer)
+        return text, extractor, time.perf_counter() - start
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def get_extract_pool():
+    global _pool, _start_queue
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork a process that already holds model threads
+            context = multiprocessing.get_context('spawn')
+            if _start_queue is None:
+                _start_queue = context.Queue()
+            _pool = context.Pool(EXTRACT_WORKERS, initializer=_init_worker, initargs=(_start_queue,))
+            _pool_tasks[_pool] = 0
+        return _pool
+
+def _release_pool(pool, tasks=0):
+    # An old pool is terminated once every batch that used it has collected its
+    # results; only then can killing a stuck worker not take healthy files with it
+    with _pool_lock:
+        _pool_tasks[pool] -= tasks
+        finished = pool is not _pool and _pool_tasks[pool] == 0
+        if finished:
+            del _pool_tasks[pool]
+            _retired.pop(pool, None)
+    if finished:
+        pool.terminate()
+
+def _retire_pool(pool):
+    # A worker is stuck: hand new batches a fresh pool
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        _retired.setdefault(pool, time.time())
+    pool.close()
+
+def set_extract_workers(workers):
+    global EXTRACT_WORKERS, _pool
+    with _pool_lock:
+        EXTRACT_WORKERS = max(1, int(workers))
+        old, _pool = _pool, None
+    if old is not None:
+        old.close()
+        _release_pool(old)
+
+def _collect_start_times():
+    while True:
+        try:
+            task_id, started = _start_queue.get_nowait()
+        except queue.Empty:
+            return
+        with _pool_lock:
+            if task_id in _started:
+                _started[task_id] = started
+
+def _overdue(pool, task_id, timeout, now):
+    # Small grace so the worker-side alarm reports first when it can
+    started = _started.get(task_id)
+    if started is not None:
+        if now - started > timeout + 5:
+            return f"extraction timed out after {timeout:.0f}s"
+    elif pool in _retired and now - _retired[pool] > timeout:
+        return "extraction pool was restarted before this file started"
+    return None
+
+def extract_texts(files, timeout=None):
+    return extract_payloads([(os.path.basename(f.name), read_file_bytes(f)) for f in files], timeout)
+
+def extract_payloads(payloads, timeout=None):
+    # Takes (file_name, bytes) pairs and returns one (text, error) pair per file;
+    # a failing or hanging file never takes the rest of the batch down with it.
+    timeout = timeout or EXTRACT_TIMEOUT
+
+    if EXTRACT_WORKERS <= 1:
+        outcomes = []
+        for name, data in payloads:
+            try:
+                outcomes.append((_extract_worker(name, data, timeout), None))
+            except Exception as e:
+                outcomes.append((None, str(e)))
+    else:
+        pool = get_extract_pool()
+        task_ids = [next(_task_ids) for _ in payloads]
+        with _pool_lock:
+            _pool_tasks[pool] += len(task_ids)
+            _started.update(dict.fromkeys(task_ids))
+        jobs = [
+            pool.apply_async(_extract_worker, (name, data, timeout, task_id))
+            for (name, data), task_id in zip(payloads, task_ids)
+        ]
+        outcomes = [None] * len(jobs)
+        pending = list(range(len(jobs)))
+        stuck = False
+        try:
+            while pending:
+                _collect_start_times()
+                now = time.time()
+                for i in list(pending):
+                    if jobs[i].ready():
+                        try:
+                            outcomes[i] = (jobs[i].get(), None)
+                        except Exception as e:
+                            outcomes[i] = (None, str(e))
+                    else:
+                        error = _overdue(pool, task_ids[i], timeout, now)
+                        if error is None:
+                            continue
+                        stuck = True
+                        outcomes[i] = (None, error)
+                    pending.remove(i)
+                if pending:
+                    jobs[pending[0]].wait(0.25)
+        finally:
+            with _pool_lock:
+                for task_id in task_ids:
+                    _started.pop(task_id, None)
+            if stuck:
+                _retire_pool(pool)
+            _release_pool(pool, len(task_ids))
+
+    results = []
+    for (name, data), (result, error) in zip(payloads, outcomes):
+        text, extractor, seconds = result or (None, None, None)
+        metrics.record('extract', seconds, status='error' if error else 'ok', file_name=name,
+                       size_bytes=len(data), pages=metrics.page_count(name, data), extractor=extractor)
+        results.append((text, error))
+    return results
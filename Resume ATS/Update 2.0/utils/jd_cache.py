@@ -0,0 +1,46 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+# Process-wide cache of per-JD work (extracted skills, embeddings), shared by every page
+JD_CACHE_SIZE = 64
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+def jd_key(jd_text):
+    normalized = re.sub(r'\s+', ' ', jd_text).strip().lower()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def get(jd_text, field):
+    key = jd_key(jd_text)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and field in entry:
+            _entries.move_to_end(key)
+            _stats['hits'] += 1
+            return entry[field]
+        _stats['misses'] += 1
+        return None
+
+def put(jd_text, field, value):
+    key = jd_key(jd_text)
+    with _lock:
+        _entries.setdefault(key, {})[field] = value
+        _entries.move_to_end(key)
+        while len(_entries) > JD_CACHE_SIZE:
+            _entries.popitem(last=False)
+            _stats['evictions'] += 1
+    return value
+
+def cache_stats():
+    with _lock:
+        return {**_stats, 'size': len(_entries), 'capacity': JD_CACHE_SIZE}
+
+def clear():
+    with _lock:
+        _entries.clear()
+        for k in _stats:
+            _stats[k] = 0
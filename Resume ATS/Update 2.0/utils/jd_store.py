@@ -0,0 +1,90 @@
+import json
+import os
+import numpy as np
+from utils import jd_cache
+from utils.db import (
+    get_jd_template_state, upsert_jd_template, touch_jd_template, delete_jd_templates, list_jd_templates,
+    get_jd_template_text, load_jd_template_embeddings, save_jd_template_embeddings
+)
+from utils.model_registry import EMBEDDING_MODEL_NAME
+from utils.parser import EMBEDDING_VERSION, extract_skills_from_jd, encode_texts
+
+# JD templates stay as jd_templates/<name>.json files (easy to edit and share),
+# indexed in the jd_templates table with their text, skills and embedding. A
+# sync only stats the directory; files are opened again only when their mtime
+# changed, and skills/embeddings only when the text itself changed.
+JD_DIR = "jd_templates"
+
+
+def _template_files():
+    if not os.path.isdir(JD_DIR):
+        return {}
+    return {
+        entry.name[:-len(".json")]: entry
+        for entry in os.scandir(JD_DIR)
+        if entry.is_file() and entry.name.endswith(".json")
+    }
+
+
+def _read_template(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("jd", "")
+
+
+def _store(name, jd_text, mtime, model=None):
+    embedding = encode_texts([jd_text], model)[0] if model is not None else None
+    upsert_jd_template(
+        name, jd_text, jd_cache.jd_key(jd_text), sorted(extract_skills_from_jd(jd_text)), mtime,
+        embedding, EMBEDDING_MODEL_NAME if model is not None else None, EMBEDDING_VERSION
+    )
+
+
+def sync_templates(model=None):
+    files = _template_files()
+    state = get_jd_template_state()
+    for name, entry in files.items():
+        mtime = entry.stat().st_mtime
+        known = state.get(name)
+        if known is not None and known[1] == mtime:
+            continue
+        jd_text = _read_template(entry.path)
+        if known is not None and known[0] == jd_cache.jd_key(jd_text):
+            touch_jd_template(name, mtime)
+        else:
+            _store(name, jd_text, mtime, model)
+    removed = set(state) - set(files)
+    if removed:
+        delete_jd_templates(removed)
+
+
+def save_template(name, jd_text, model=None):
+    # Writes the file and indexes it in one go, embedding included when a model is given
+    os.makedirs(JD_DIR, exist_ok=True)
+    path = os.path.join(JD_DIR, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"jd": jd_text}, f)
+    _store(name, jd_text, os.stat(path).st_mtime, model)
+
+
+def list_templates():
+    templates = list_jd_templates()
+    for template in templates:
+        template['skills'] = [s for s in (template['skills'] or '').split(', ') if s]
+    return templates
+
+
+def get_template_text(name):
+    return get_jd_template_text(name) or ""
+
+
+def get_template_embeddings(names, model):
+    # Stored vectors in the order given; templates saved before a model was
+    # available (or with another one) are encoded together once and stored
+    names = list(names)
+    embeddings = load_jd_template_embeddings(names, EMBEDDING_MODEL_NAME, EMBEDDING_VERSION)
+    missing = [n for n in names if n not in embeddings]
+    if missing:
+        vectors = encode_texts([get_template_text(n) for n in missing], model)
+        save_jd_template_embeddings(zip(missing, vectors), EMBEDDING_MODEL_NAME, EMBEDDING_VERSION)
+        embeddings.update(zip(missing, vectors))
+    return np.vstack([embeddings[n] for n in names]) if names else np.empty((0, 0), dtype=np.float32)
@@ -0,0 +1,192 @@
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from utils.db import connect_db, fetch_dicts, insert_resumes_bulk
+from utils.model_registry import get_model
+from utils.parser import process_resume_files
+
+# Uploads are queued as jobs in resumes.db and processed by a small worker pool
+# shared by every Streamlit session in this process, so a recruiter's tab never
+# blocks on parsing and results survive reruns, navigation and page reloads.
+JOB_WORKERS = int(os.environ.get("ATS_JOB_WORKERS", 2))
+JOB_BATCH_SIZE = 16
+ACTIVE_JOB_STATUSES = ('queued', 'running')
+
+JOBS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        status TEXT NOT NULL DEFAULT 'queued',
+        jd_text TEXT NOT NULL,
+        submitted_by TEXT,
+        total INTEGER NOT NULL DEFAULT 0,
+        processed INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT,
+        started_at TEXT,
+        finished_at TEXT,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id);
+    CREATE TABLE IF NOT EXISTS job_files (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER NOT NULL,
+        file_name TEXT NOT NULL,
+        data BLOB,
+        status TEXT NOT NULL DEFAULT 'queued',
+        score REAL,
+        resume_id INTEGER,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_files_job ON job_files(job_id, status);
+'''
+
+_lock = threading.Lock()
+_executor = None
+_active_jobs = set()
+_recovered = False
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def init_jobs():
+    global _recovered
+    with connect_db() as conn:
+        conn.executescript(JOBS_SCHEMA)
+    with _lock:
+        recover, _recovered = not _recovered, True
+    if recover:
+        # Jobs left queued or half-done by a previous server process
+        with connect_db() as conn:
+            pending = [row[0] for row in conn.execute(
+                f"SELECT id FROM jobs WHERE status IN ({', '.join('?' * len(ACTIVE_JOB_STATUSES))}) ORDER BY id",
+                ACTIVE_JOB_STATUSES
+            )]
+        for job_id in pending:
+            _schedule(job_id)
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="ats-job")
+        return _executor
+
+
+def _schedule(job_id):
+    with _lock:
+        if job_id in _active_jobs:
+            return
+        _active_jobs.add(job_id)
+    _get_executor().submit(_run_job, job_id)
+
+
+def submit_job(files, jd_text, submitted_by=None):
+    # files: objects with .name and .getvalue()/.read(), e.g. Streamlit uploads
+    conn = connect_db()
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO jobs (jd_text, submitted_by, total, created_at) VALUES (?, ?, ?, ?)",
+            (jd_text, submitted_by, len(files), _now())
+        )
+        job_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO job_files (job_id, file_name, data) VALUES (?, ?, ?)",
+            [(job_id, os.path.basename(f.name), f.getvalue() if hasattr(f, 'getvalue') else f.read())
+             for f in files]
+        )
+    _schedule(job_id)
+    return job_id
+
+
+def _run_job(job_id):
+    conn = connect_db()
+    try:
+        jd_text = conn.execute("SELECT jd_text FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        with conn:
+            conn.execute("UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?) WHERE id = ?",
+                         (_now(), job_id))
+        model = get_model()
+
+        while True:
+            # A recovered job resumes with the files no committed batch has claimed
+            batch = conn.execute('''
+                SELECT id, file_name, data FROM job_files
+                WHERE job_id = ? AND status = 'queued' AND resume_id IS NULL ORDER BY id LIMIT ?
+            ''', (job_id, JOB_BATCH_SIZE)).fetchall()
+            if not batch:
+                break
+
+            files = []
+            for _, file_name, data in batch:
+                buffer = io.BytesIO(data or b"")
+                buffer.name = file_name
+                files.append(buffer)
+            results = process_resume_files(files, jd_text, model)
+
+            parsed = [r for r in results if r['data'] is not None]
+            if parsed:
+                # File outcomes commit with the resumes, so a crash mid-job never
+                # reprocesses (and then skips as duplicates) files already inserted
+                insert_resumes_bulk(
+                    [(r['file_name'], r['data']) for r in parsed],
+                    before_commit=lambda conn, resume_ids: _record_batch(conn, job_id, batch, results, parsed, resume_ids)
+                )
+            else:
+                with conn:
+                    _record_batch(conn, job_id, batch, results)
+
+        with conn:
+            conn.execute("UPDATE jobs SET status = 'done', finished_at = ? WHERE id = ?", (_now(), job_id))
+    except Exception as e:
+        with conn:
+            conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                         (str(e), _now(), job_id))
+    finally:
+        with _lock:
+            _active_jobs.discard(job_id)
+
+
+def _record_batch(conn, job_id, batch, results, parsed=(), resume_ids=()):
+    for r, resume_id in zip(parsed, resume_ids):
+        r['resume_id'] = resume_id
+    updates = []
+    for (file_id, _, _), r in zip(batch, results):
+        if r['duplicate_of'] is not None:
+            updates.append(('skipped', None, None, f"duplicate of {r['duplicate_of']}", file_id))
+        elif r['error']:
+            updates.append(('failed', None, None, r['error'], file_id))
+        else:
+            updates.append(('done', r['data']['score'], r['resume_id'], None, file_id))
+    conn.executemany(
+        "UPDATE job_files SET status = ?, score = ?, resume_id = ?, error = ?, data = NULL WHERE id = ?",
+        updates
+    )
+    conn.execute("UPDATE jobs SET processed = processed + ? WHERE id = ?", (len(batch), job_id))
+
+
+def has_active_jobs():
+    with connect_db() as conn:
+        return conn.execute(
+            f"SELECT 1 FROM jobs WHERE status IN ({', '.join('?' * len(ACTIVE_JOB_STATUSES))}) LIMIT 1",
+            ACTIVE_JOB_STATUSES
+        ).fetchone() is not None
+
+
+def list_jobs(limit=20):
+    with connect_db() as conn:
+        return fetch_dicts(conn, '''
+            SELECT id, status, submitted_by, total, processed, created_at, started_at, finished_at, error
+            FROM jobs ORDER BY id DESC LIMIT ?
+        ''', (limit,))
+
+
+def get_job_files(job_id):
+    with connect_db() as conn:
+        return fetch_dicts(conn, '''
+            SELECT file_name, status, score, resume_id, error
+            FROM job_files WHERE job_id = ? ORDER BY id
+        ''', (job_id,))
@@ -0,0 +1,183 @@
+import atexit
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import numpy as np
+from utils import db
+
+# Lightweight pipeline instrumentation: every hook appends one tuple to an
+# in-memory ring buffer and a pending list that is written to the
+# pipeline_metrics table in batches, so it is cheap enough to leave on.
+METRICS_ENABLED = os.environ.get("ATS_METRICS", "1") != "0"
+METRICS_BUFFER_SIZE = 5000
+METRICS_FLUSH_EVERY = 200
+METRICS_FLUSH_INTERVAL = 10  # seconds
+METRICS_RETENTION_DAYS = 14
+
+# Per-file stages carry file details; batch stages record how many items they covered
+METRIC_STAGES = ['extract', 'entities', 'embed', 'insert']
+
+METRICS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS pipeline_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recorded_at TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        seconds REAL,
+        items INTEGER NOT NULL DEFAULT 1,
+        status TEXT NOT NULL DEFAULT 'ok',
+        file_name TEXT,
+        size_bytes INTEGER,
+        pages INTEGER,
+        extractor TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_pipeline_metrics_time ON pipeline_metrics(recorded_at, stage);
+'''
+METRIC_COLUMNS = ['recorded_at', 'stage', 'seconds', 'items', 'status', 'file_name', 'size_bytes', 'pages', 'extractor']
+
+_lock = threading.Lock()
+_buffer = deque(maxlen=METRICS_BUFFER_SIZE)
+_pending = []
+_last_flush = time.monotonic()
+_schema_ready = False
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def page_count(file_name, data):
+    # PDFs: page objects counted in the raw bytes, approximate but far cheaper
+    # than parsing. Images are one page; DOCX has no fixed page count.
+    file_type = file_name.split('.')[-1].lower()
+    if file_type == "pdf":
+        return len(re.findall(rb'/Type\s*/Page(?![s\w])', data)) or None
+    return None if file_type == "docx" else 1
+
+
+def record(stage, seconds, items=1, status='ok', file_name=None, size_bytes=None, pages=None, extractor=None):
+    global _last_flush
+    if not METRICS_ENABLED:
+        return
+    row = (_now(), stage, seconds, items, status, file_name, size_bytes, pages, extractor)
+    with _lock:
+        _buffer.append(row)
+        _pending.append(row)
+        due = len(_pending) >= METRICS_FLUSH_EVERY or time.monotonic() - _last_flush >= METRICS_FLUSH_INTERVAL
+    if due:
+        flush()
+
+
+@contextmanager
+def timed(stage, items=1, **fields):
+    start = time.perf_counter()
+    status = 'error'
+    try:
+        yield
+        status = 'ok'
+    finally:
+        record(stage, time.perf_counter() - start, items, status, **fields)
+
+
+def recent(limit=None):
+    # Newest rows still in memory, including ones not yet flushed
+    with _lock:
+        rows = list(_buffer)
+    return rows[-limit:] if limit else rows
+
+
+def _ensure_schema(conn):
+    global _schema_ready
+    if not _schema_ready:
+        conn.executescript(METRICS_SCHEMA)
+        cutoff = (datetime.now() - timedelta(days=METRICS_RETENTION_DAYS)).strftime('%Y-%m-%d %H:%M:%S')
+        conn.execute("DELETE FROM pipeline_metrics WHERE recorded_at < ?", (cutoff,))
+        conn.commit()
+        _schema_ready = True
+
+
+def flush():
+    # Must not be called inside an open transaction on this thread's connection
+    global _pending, _last_flush
+    with _lock:
+        rows, _pending = _pending, []
+        _last_flush = time.monotonic()
+    if not rows:
+        return
+    conn = db.connect_db()
+    _ensure_schema(conn)
+    with conn:
+        conn.executemany(
+            f"INSERT INTO pipeline_metrics ({', '.join(METRIC_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(METRIC_COLUMNS))})",
+            rows
+        )
+
+atexit.register(flush)
+
+
+# =====================
+# Reporting
+# =====================
+def _since(hours):
+    return (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def get_stage_summary(hours=24):
+    # p50/p95 per call and throughput (items per busy second) for each stage
+    flush()
+    conn = db.connect_db()
+    _ensure_schema(conn)
+    rows = conn.execute('''
+        SELECT stage, seconds, items FROM pipeline_metrics
+        WHERE recorded_at >= ? AND status = 'ok' AND seconds IS NOT NULL
+    ''', (_since(hours),)).fetchall()
+    errors = dict(conn.execute('''
+        SELECT stage, COUNT(*) FROM pipeline_metrics
+        WHERE recorded_at >= ? AND status != 'ok' GROUP BY stage
+    ''', (_since(hours),)).fetchall())
+
+    summary = []
+    for stage in METRIC_STAGES + sorted({r[0] for r in rows} - set(METRIC_STAGES)):
+        seconds = np.array([r[1] for r in rows if r[0] == stage])
+        if not len(seconds) and not errors.get(stage):
+            continue
+        items = sum(r[2] for r in rows if r[0] == stage)
+        summary.append({
+            'stage': stage,
+            'calls': len(seconds),
+            'items': items,
+            'errors': errors.get(stage, 0),
+            'p50_ms': float(np.percentile(seconds, 50)) * 1000 if len(seconds) else None,
+            'p95_ms': float(np.percentile(seconds, 95)) * 1000 if len(seconds) else None,
+            'items_per_sec': float(items / seconds.sum()) if seconds.sum() else None,
+        })
+    return summary
+
+
+def get_throughput(hours=24, stage='extract'):
+    # Files per hour bucket, for a throughput-over-time chart
+    flush()
+    conn = db.connect_db()
+    _ensure_schema(conn)
+    return db.fetch_dicts(conn, '''
+        SELECT substr(recorded_at, 1, 13) || ':00' AS hour, SUM(items) AS items, SUM(seconds) AS busy_seconds
+        FROM pipeline_metrics
+        WHERE recorded_at >= ? AND stage = ? AND status = 'ok'
+        GROUP BY hour ORDER BY hour
+    ''', (_since(hours), stage))
+
+
+def get_slowest_files(hours=24, limit=20):
+    flush()
+    conn = db.connect_db()
+    _ensure_schema(conn)
+    return db.fetch_dicts(conn, '''
+        SELECT recorded_at, file_name, seconds, size_bytes, pages, extractor, status
+        FROM pipeline_metrics
+        WHERE recorded_at >= ? AND stage = 'extract' AND seconds IS NOT NULL
+        ORDER BY seconds DESC LIMIT ?
+    ''', (_since(hours), limit))
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+
+# One embedding model per process, shared by every page, the job queue and the
+# CLI. sentence-transformers (and torch behind it) is only imported on first
+# use, so pages that never embed don't pay for it at startup.
+BERT_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+MODEL_WARMUP = os.environ.get("ATS_MODEL_WARMUP", "1") != "0"
+
+# Inference backend. The ONNX variants run on ONNX Runtime and are much faster
+# on CPU-only boxes; the int8 one is dynamically quantized for the instruction
+# set in ATS_ONNX_QUANTIZATION (arm64, avx2, avx512 or avx512_vnni).
+EMBEDDING_BACKENDS = ["torch", "onnx", "onnx-int8"]
+EMBEDDING_BACKEND = os.environ.get("ATS_EMBEDDING_BACKEND", "torch")
+ONNX_QUANTIZATION = os.environ.get("ATS_ONNX_QUANTIZATION", "avx2")
+MODEL_DIR = os.environ.get("ATS_MODEL_DIR", "models")
+ONNX_FILE = "onnx/model.onnx"
+ONNX_INT8_FILE = f"onnx/model_qint8_{ONNX_QUANTIZATION}.onnx"
+
+# Name stored next to each embedding. Quantized vectors drift slightly from the
+# fp32 ones, so they are kept apart and never compared against each other.
+EMBEDDING_MODEL_NAME = BERT_MODEL_NAME + ("@int8" if EMBEDDING_BACKEND == "onnx-int8" else "")
+
+_model = None
+_lock = threading.Lock()
+_warmup_thread = None
+
+
+def local_model_path():
+    return os.path.join(MODEL_DIR, BERT_MODEL_NAME.split('/')[-1])
+
+
+def prepare_model(backend=EMBEDDING_BACKEND):
+    # Makes sure the files for a backend exist under MODEL_DIR: the first call
+    # downloads the model once, exports it to ONNX and quantizes it as needed
+    from sentence_transformers import SentenceTransformer
+    path = local_model_path()
+    if not os.path.isdir(path):
+        SentenceTransformer(BERT_MODEL_NAME).save(path)
+    if backend != "torch" and not os.path.exists(os.path.join(path, ONNX_FILE)):
+        SentenceTransformer(path, backend="onnx").save(path)
+    if backend == "onnx-int8" and not os.path.exists(os.path.join(path, ONNX_INT8_FILE)):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        export_dynamic_quantized_onnx_model(
+            SentenceTransformer(path, backend="onnx"), ONNX_QUANTIZATION, path
+        )
+    return path
+
+
+def load_bert_model(backend=None):
+    from sentence_transformers import SentenceTransformer
+    backend = backend or EMBEDDING_BACKEND
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {EMBEDDING_BACKENDS}")
+    path = prepare_model(backend)
+    if backend == "torch":
+        return SentenceTransformer(path)
+    file_name = ONNX_INT8_FILE if backend == "onnx-int8" else ONNX_FILE
+    return SentenceTransformer(path, backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def get_model():
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                _model = load_bert_model()
+    return _model
+
+
+def is_model_loaded():
+    return _model is not None
+
+
+def _warmup():
+    try:
+        # One tiny encode also initializes the tokenizer and inference kernels
+        get_model().encode(["warmup"])
+    except Exception:
+        pass
+
+
+def start_warmup():
+    # Loads the model on a daemon thread; get_model() callers simply wait on the
+    # lock if they arrive before it finishes
+    global _warmup_thread
+    if not MODEL_WARMUP or _model is not None:
+        return
+    with _lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_warmup, name="ats-model-warmup", daemon=True)
+            _warmup_thread.start()
+
+
+def compare_backends(texts, backends=None, batch_size=32):
+    # Encodes the same sample with every backend and reports throughput plus
+    # drift against the torch baseline: mean/min cosine between the two vectors
+    # of each text, and how often each text's nearest neighbour is unchanged.
+    import numpy as np
+    backends = backends or EMBEDDING_BACKENDS
+    report = []
+    baseline = None
+    for backend in ["torch"] + [b for b in backends if b != "torch"]:
+        model = load_bert_model(backend)
+        model.encode(texts[:batch_size], batch_size=batch_size)
+        start = time.perf_counter()
+        vectors = model.encode(texts, batch_size=batch_size, normalize_embeddings=True,
+                               convert_to_numpy=True).astype(np.float32)
+        elapsed = time.perf_counter() - start
+
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, -np.inf)
+        neighbours = similarity.argmax(axis=1)
+        if baseline is None:
+            baseline = (vectors, neighbours, elapsed)
+        cosine = np.einsum('ij,ij->i', vectors, baseline[0])
+        report.append({
+            'backend': backend,
+            'texts_per_sec': len(texts) / elapsed if elapsed else float('inf'),
+            'speedup': baseline[2] / elapsed if elapsed else float('inf'),
+            'mean_cosine': float(cosine.mean()),
+            'min_cosine': float(cosine.min()),
+            'neighbour_agreement': float((neighbours == baseline[1]).mean()),
+        })
+    return [r for r in report if r['backend'] in backends]
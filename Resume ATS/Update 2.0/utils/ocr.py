@@ -0,0 +1,105 @@
+import io
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, ImageOps, ImageSequence
+import pytesseract
+from PyPDF2 import PdfReader
+
+# OCR is the slowest per-file path: pages are shrunk to what tesseract needs,
+# binarized, OCR'd in parallel (tesseract runs as a subprocess, so threads
+# overlap fine) and the result is cached on disk by file content.
+OCR_CACHE_DIR = os.environ.get("ATS_OCR_CACHE_DIR", "ocr_cache")
+OCR_THREADS = int(os.environ.get("ATS_OCR_THREADS", 4))
+OCR_MAX_SIDE = 2200  # px, about 200 dpi for a letter page
+# Seconds per page; tesseract is killed past it, even when the caller has given up
+OCR_PAGE_TIMEOUT = float(os.environ.get("ATS_OCR_PAGE_TIMEOUT", 60))
+# Bump when preprocessing changes, so cached text is recomputed
+OCR_VERSION = 2
+
+
+# =====================
+# Image Preprocessing
+# =====================
+def otsu_threshold(gray):
+    # Threshold that best separates ink from paper in the grayscale histogram
+    hist = np.asarray(gray.histogram()[:256], dtype=np.float64)
+    p = hist / hist.sum()
+    w0 = np.cumsum(p)
+    mu = np.cumsum(p * np.arange(256))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mu[-1] * w0 - mu) ** 2 / (w0 * (1 - w0))
+    return int(np.nanargmax(between)) if np.isfinite(between).any() else 127
+
+def preprocess_image(image):
+    gray = ImageOps.exif_transpose(image).convert("L")
+    scale = OCR_MAX_SIDE / max(gray.size)
+    if scale < 1:
+        gray = gray.resize((round(gray.width * scale), round(gray.height * scale)), Image.LANCZOS)
+    threshold = otsu_threshold(gray)
+    return gray.point(lambda v: 255 if v > threshold else 0)
+
+
+# =====================
+# OCR
+# =====================
+def ocr_image(image):
+    return pytesseract.image_to_string(preprocess_image(image), timeout=OCR_PAGE_TIMEOUT)
+
+def ocr_images(images):
+    images = list(images)
+    if len(images) <= 1 or OCR_THREADS <= 1:
+        return "\n".join(ocr_image(image) for image in images)
+    executor = ThreadPoolExecutor(max_workers=min(OCR_THREADS, len(images)))
+    try:
+        return "\n".join(executor.map(ocr_image, images))
+    finally:
+        # When the per-file alarm interrupts us, don't wait for the remaining
+        # pages: queued ones are dropped and running ones hit OCR_PAGE_TIMEOUT
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def image_frames(data):
+    # Multi-page TIFFs (fax scans) carry one frame per page
+    image = Image.open(io.BytesIO(data))
+    return [frame.copy() for frame in ImageSequence.Iterator(image)]
+
+def pdf_page_images(data):
+    # Scanned PDFs carry one embedded image per page (sometimes a few strips).
+    # PyPDF2 can't decode every image filter (e.g. PNG-predicted Flate), so a
+    # page whose images won't decode is skipped rather than failing the file.
+    images = []
+    for page in PdfReader(io.BytesIO(data)).pages:
+        try:
+            for embedded in page.images:
+                images.append(Image.open(io.BytesIO(embedded.data)))
+        except Exception:
+            continue
+    return images
+
+
+# =====================
+# OCR Result Cache
+# =====================
+def _cache_path(data):
+    return os.path.join(OCR_CACHE_DIR, f"{hashlib.sha256(data).hexdigest()}.v{OCR_VERSION}.txt")
+
+def cached_ocr(data, run):
+    path = _cache_path(data)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    text = run(data)
+    os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+    # Write-then-rename, so a concurrent reader never sees a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return text
+
+def ocr_image_bytes(data):
+    return cached_ocr(data, lambda d: ocr_images(image_frames(d)))
+
+def ocr_pdf_bytes(data):
+    return cached_ocr(data, lambda d: ocr_images(pdf_page_images(d)))
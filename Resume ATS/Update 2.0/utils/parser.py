@@ -1,48 +1,103 @@
+import os
 import re
-import docx2txt
-from pdfminer.high_level import extract_text as extract_pdf_text
-from PIL import Image
-import pytesseract
-from sentence_transformers import SentenceTransformer, util
+import time
+from contextlib import contextmanager
+import numpy as np
+from utils.extraction import (
+    extract_text, extract_text_from_pdf, extract_text_from_docx, extract_text_from_image,
+    extract_payloads, read_file_bytes, content_hash
+)
+from utils.db import (
+    load_resume_embeddings, save_resume_embeddings, load_resume_chunks, save_resume_chunks,
+    get_resume_texts, find_resumes_by_hash, register_jd_template, get_resume_ids_after, save_jd_scores
+)
+from utils import jd_cache, metrics
+from utils.model_registry import BERT_MODEL_NAME, EMBEDDING_MODEL_NAME, load_bert_model
+from utils.skills import compile_skill_matcher, match_skills, taxonomy_skills_in
 
 
 # =====================
 # BERT Model Initialization
 # =====================
-def load_bert_model():
-    return SentenceTransformer('all-MiniLM-L6-v2')
+# The model itself lives in utils.model_registry (shared, lazily loaded)
+# Bump when the embedded text or its normalization changes, so stored vectors get rebuilt
+EMBEDDING_VERSION = 2
 
 
 # =====================
-# Text Extraction Handlers
+# Section Extractor
 # =====================
-def extract_text_from_pdf(file):
-    return extract_pdf_text(file)
+SECTION_KEYWORDS = {
+    'experience': ['experience', 'work history', 'employment'],
+    'education': ['education', 'academic', 'qualifications'],
+    'skills': ['skills', 'competencies', 'technologies'],
+    'projects': ['projects'],
+    'certifications': ['certifications', 'certificates', 'licenses'],
+    'summary': ['summary', 'profile', 'objective'],
+}
+HEADING_MAX_WORDS = 4
+# Words that may precede a keyword in an unstyled heading ("Relevant Work Experience")
+HEADING_QUALIFIERS = {
+    'work', 'professional', 'relevant', 'technical', 'key', 'core', 'career', 'additional',
+    'other', 'selected', 'recent', 'academic', 'educational', 'personal', 'and',
+}
 
-def extract_text_from_docx(file):
-    return docx2txt.process(file)
+def _unstyled_heading(words, keyword, section_keywords):
+    # Only the keyword itself, optionally after qualifiers or other keywords:
+    # "Education and Certifications" is a heading, "Bachelor of Education",
+    # "5 Years Experience" and "Information Technologies" are content
+    size = len(keyword.split())
+    if words[-size:] != keyword.split():
+        return False
+    known = HEADING_QUALIFIERS | {w for keywords in section_keywords.values() for k in keywords for w in k.split()}
+    return all(w in known for w in words[:-size])
 
-def extract_text_from_image(file):
-    image = Image.open(file)
-    return pytesseract.image_to_string(image)
+def _heading_section(line, section_keywords):
+    words = re.findall(r'[a-z]+', line.lower())
+    if not words or len(words) > HEADING_MAX_WORDS:
+        return None
+    heading = ' '.join(words)
+    # "Work Experience", "EDUCATION & TRAINING", "Skills:" are headings;
+    # "More experience with SQL" is a sentence that merely mentions one
+    stripped = line.strip()
+    styled = stripped.endswith(':') or stripped.isupper()
+    for section, keywords in section_keywords.items():
+        if any((styled and k in heading) or _unstyled_heading(words, k, section_keywords) for k in keywords):
+            return section
+    return None
 
+def section_spans(text, section_keywords=SECTION_KEYWORDS):
+    # One pass over the lines: every short heading line opens a section that runs
+    # until the next heading, so blank lines inside a section are kept. Yields
+    # (section, body_start, end) for every heading, repeats included, after a
+    # leading 'header' span. Offsets index into the original text.
+    headings = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        section = _heading_section(line, section_keywords)
+        if section:
+            headings.append((section, offset, offset + len(line)))
+        offset += len(line)
+
+    bounds = [('header', 0, 0)] + headings
+    for i, (section, _, body_start) in enumerate(bounds):
+        end = bounds[i + 1][1] if i + 1 < len(bounds) else len(text)
+        yield section, body_start, end
+
+def sectionize(text, section_keywords=SECTION_KEYWORDS, spans=None):
+    # The first non-empty occurrence of each section, keyed by name. Pass the
+    # spans when they are already computed (they are reused for chunking).
+    sections = {}
+    for section, start, end in spans if spans is not None else section_spans(text, section_keywords):
+        body = text[start:end].strip()
+        if body and section not in sections:
+            sections[section] = {'start': start, 'end': end, 'text': body}
+    return sections
 
-# =====================
-# Section Extractor
-# =====================
 def extract_section(text, keywords):
-    lines = text.lower().split('\n')
-    section = []
-    found = False
-    for line in lines:
-        if any(k in line for k in keywords):
-            found = True
-            continue
-        if found and line.strip() == "":
-            break
-        if found:
-            section.append(line)
-    return '\n'.join(section).strip()
+    # Other known headings still end the section
+    section_keywords = {'section': keywords, **SECTION_KEYWORDS}
+    return sectionize(text, section_keywords).get('section', {}).get('text', '')
 
 
 # =====================
@@ -53,13 +108,27 @@ def extract_skills_from_jd(jd_text):
     words = re.findall(r'\b([A-Za-z0-9\+\.#]+)\b', jd_text)
     stopwords = {'the', 'and', 'with', 'for', 'you', 'are', 'our', 'this', 'that', 'have'}
     filtered = [w.lower() for w in words if len(w) > 2 and w.lower() not in stopwords]
-    return list(set(filtered))
+    # Multi-word skills and synonyms ("power bi", "c++") come from the shared taxonomy
+    return list(set(filtered) | set(taxonomy_skills_in(jd_text)))
+
+def get_jd_skills(jd_text):
+    skills = jd_cache.get(jd_text, 'skills')
+    if skills is None:
+        skills = jd_cache.put(jd_text, 'skills', tuple(extract_skills_from_jd(jd_text)))
+    return skills
+
+def get_jd_matcher(jd_text):
+    # Compiled once per JD and shared through the JD cache
+    matcher = jd_cache.get(jd_text, 'matcher')
+    if matcher is None:
+        matcher = jd_cache.put(jd_text, 'matcher', compile_skill_matcher(get_jd_skills(jd_text)))
+    return matcher
 
 
 # =====================
 # Entity & Skill Matcher
 # =====================
-def extract_entities(text, jd_text):
+def extract_entities(text, jd_text, sections=None):
     lines = text.strip().split('\n')
     lines = [l.strip() for l in lines if l.strip()]
 
@@ -67,11 +136,12 @@ def extract_entities(text, jd_text):
     email_match = re.search(r'[\w\.-]+@[\w\.-]+', text)
     phone_match = re.search(r'(\+?\d{1,3}[\s-])?(?:\(?\d{2,4}\)?[\s-]?)?\d{6,10}', text)
 
-    jd_skills = extract_skills_from_jd(jd_text)
-    resume_skills = [kw for kw in jd_skills if kw.lower() in text.lower()]
+    jd_skills = get_jd_skills(jd_text)
+    resume_skills = match_skills(get_jd_matcher(jd_text), text)
 
-    experience = extract_section(text, ['experience', 'work history'])
-    education = extract_section(text, ['education', 'academic'])
+    sections = sections if sections is not None else sectionize(text)
+    experience = sections.get('experience', {}).get('text', '')
+    education = sections.get('education', {}).get('text', '')
 
     return {
         'name': name,
@@ -87,25 +157,263 @@ def extract_entities(text, jd_text):
 # =====================
 # BERT Score Calculator
 # =====================
-def match_score_bert(resume_text, jd_text, model):
-    resume_embedding = model.encode(resume_text, convert_to_tensor=True)
-    jd_embedding = model.encode(jd_text, convert_to_tensor=True)
-    score = util.cos_sim(resume_embedding, jd_embedding)
-    return float(score.item())
+def encode_texts(texts, model, batch_size=32):
+    # Unit-length float32 rows, so cosine similarity is a plain dot product
+    return model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                        normalize_embeddings=True).astype(np.float32)
+
+def get_jd_embeddings(jd_texts, model):
+    # Cached per normalized JD text; all misses are encoded together in one call
+    field = ('embedding', EMBEDDING_MODEL_NAME)
+    embeddings = [jd_cache.get(t, field) for t in jd_texts]
+    missing = [i for i, e in enumerate(embeddings) if e is None]
+    if missing:
+        vectors = encode_texts([jd_texts[i] for i in missing], model)
+        for i, vec in zip(missing, vectors):
+            embeddings[i] = jd_cache.put(jd_texts[i], field, vec)
+    return np.vstack(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+
+def get_jd_embedding(jd_text, model):
+    return get_jd_embeddings([jd_text], model)[0]
+
+def match_score_bert(resume_text, jd_text, model, pooling=None):
+    chunk_vectors = encode_chunks([chunk_text(resume_text)], model)[0]
+    return float(pool_scores(chunk_vectors, get_jd_embedding(jd_text, model), pooling))
+
+def top_k_matches(query_embedding, embeddings, k=10):
+    # One matrix-vector product over normalized rows, then a partial sort for the top k
+    return top_k_scores(np.asarray(embeddings) @ query_embedding, k)
+
+def top_k_scores(scores, k=10):
+    scores = np.asarray(scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=int), np.array([], dtype=np.float32)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
+
+def attach_embedding(entities, chunk_vectors):
+    entities['embedding'] = resume_embedding(chunk_vectors)
+    entities['chunk_embeddings'] = chunk_vectors
+    entities['embedding_model'] = EMBEDDING_MODEL_NAME
+    entities['embedding_version'] = EMBEDDING_VERSION
+
+
+# =====================
+# Chunked Embeddings
+# =====================
+# MiniLM only reads the first 256 word pieces, so a resume is embedded as chunks:
+# one per section, long sections split into overlapping word windows that stay
+# under that limit. A resume scores as the max (or mean) of its chunk scores.
+CHUNK_WORDS = 150
+CHUNK_OVERLAP = 30
+CHUNK_POOLING = os.environ.get("ATS_CHUNK_POOLING", "max")
+
+def chunk_text(text, spans=None):
+    # spans: the resume's section_spans, as already computed for sectionize
+    chunks = []
+    step = CHUNK_WORDS - CHUNK_OVERLAP
+    for _, start, end in spans if spans is not None else section_spans(text):
+        words = text[start:end].split()
+        for i in range(0, max(len(words) - CHUNK_OVERLAP, 1), step):
+            if words[i:i + CHUNK_WORDS]:
+                chunks.append(' '.join(words[i:i + CHUNK_WORDS]))
+    return chunks or [text]
+
+def encode_chunks(chunk_lists, model, batch_size=32):
+    # Every chunk of every resume goes through one batched encode call, then the
+    # rows are split back into one (n_chunks, dim) matrix per resume
+    vectors = encode_texts([c for chunks in chunk_lists for c in chunks], model, batch_size)
+    return np.split(vectors, np.cumsum([len(chunks) for chunks in chunk_lists])[:-1])
+
+def resume_embedding(chunk_vectors):
+    # Resume-level vector for nearest-neighbour search: the normalized chunk mean
+    mean = chunk_vectors.mean(axis=0)
+    norm = np.linalg.norm(mean)
+    return (mean / norm if norm else mean).astype(np.float32)
+
+def pool_scores(chunk_vectors, query_embeddings, pooling=None):
+    # One resume against one (dim,) query or many (m, dim) queries
+    similarities = chunk_vectors @ np.asarray(query_embeddings).T
+    return similarities.max(axis=0) if (pooling or CHUNK_POOLING) == 'max' else similarities.mean(axis=0)
+
+def pooled_scores(chunk_sets, jd_embedding, pooling=None):
+    # Many resumes against one JD: a single product over all stacked chunks,
+    # then a per-resume reduce over each resume's slice
+    if not chunk_sets:
+        return np.array([], dtype=np.float32)
+    counts = np.array([len(c) for c in chunk_sets])
+    similarities = np.vstack(chunk_sets) @ jd_embedding
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    if (pooling or CHUNK_POOLING) == 'max':
+        return np.maximum.reduceat(similarities, offsets)
+    return np.add.reduceat(similarities, offsets) / counts
+
+
+# =====================
+# Stored Resume Embeddings
+# =====================
+def get_resume_chunk_embeddings(resume_ids, model):
+    # Read chunk vectors persisted at upload time; rows stored before chunking
+    # (or by another model) are chunked, encoded once and written back together
+    # with their resume-level vector.
+    resume_ids = list(resume_ids)
+    chunks = load_resume_chunks(resume_ids, EMBEDDING_MODEL_NAME, EMBEDDING_VERSION)
+    missing = [i for i in resume_ids if i not in chunks]
+    if missing:
+        texts = get_resume_texts(missing)
+        ids = [i for i in missing if i in texts]
+        if ids:
+            vectors = encode_chunks([chunk_text(texts[i]) for i in ids], model)
+            save_resume_chunks(zip(ids, vectors), EMBEDDING_MODEL_NAME, EMBEDDING_VERSION)
+            save_resume_embeddings(((i, resume_embedding(v)) for i, v in zip(ids, vectors)),
+                                   EMBEDDING_MODEL_NAME, EMBEDDING_VERSION)
+            chunks.update(zip(ids, vectors))
+    return chunks
+
+def get_resume_embeddings(resume_ids, model):
+    resume_ids = list(resume_ids)
+    embeddings = load_resume_embeddings(resume_ids, EMBEDDING_MODEL_NAME, EMBEDDING_VERSION)
+    missing = [i for i in resume_ids if i not in embeddings]
+    if missing:
+        chunks = get_resume_chunk_embeddings(missing, model)
+        embeddings.update((i, resume_embedding(v)) for i, v in chunks.items())
+    return embeddings
+
+def score_resumes(resume_ids, jd_text, model, pooling=None):
+    # Re-scores stored resumes against any JD without re-encoding them
+    chunks = get_resume_chunk_embeddings(resume_ids, model)
+    ids = [i for i in resume_ids if i in chunks]
+    scores = pooled_scores([chunks[i] for i in ids], get_jd_embedding(jd_text, model), pooling)
+    return dict(zip(ids, scores.tolist()))
+
+
+# =====================
+# JD Re-scoring
+# =====================
+RESCORE_BATCH_SIZE = 5000
+
+def skill_overlap(matcher, jd_skill_count, text):
+    # Share of the JD's skills found in the resume text
+    return len(match_skills(matcher, text)) / jd_skill_count if jd_skill_count else 0.0
+
+def jd_scoring_key(jd_text):
+    # Scores are only comparable under one JD text, model, vector version and
+    # pooling; a change to any of them makes a template rescore from scratch
+    return f"{jd_cache.jd_key(jd_text)}:{EMBEDDING_MODEL_NAME}:{EMBEDDING_VERSION}:{CHUNK_POOLING}"
+
+def rescore_jd(name, jd_text, model, batch_size=RESCORE_BATCH_SIZE):
+    # Scores stored resumes against a JD template from their stored chunk
+    # vectors and text, never re-parsing a file. Incremental: only resumes
+    # added since the last run, or every resume when the scoring key changed.
+    # Returns (jd_id, number of resumes scored).
+    jd_id, scored_through = register_jd_template(name, jd_scoring_key(jd_text))
+    pending = get_resume_ids_after(scored_through)
+    if not pending:
+        return jd_id, 0
+
+    jd_embedding = get_jd_embedding(jd_text, model)
+    matcher = get_jd_matcher(jd_text)
+    jd_skill_count = len(matcher['order'])
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        chunks = get_resume_chunk_embeddings(batch, model)
+        texts = get_resume_texts(batch)
+        ids = [i for i in batch if i in chunks]
+        scores = pooled_scores([chunks[i] for i in ids], jd_embedding)
+        # Overlap is matched against each resume's stored text: resume_skills only
+        # holds what overlapped the JD used at upload, so it can't answer for others
+        save_jd_scores(jd_id, [(i, float(score), skill_overlap(matcher, jd_skill_count, texts.get(i, '')))
+                               for i, score in zip(ids, scores)], batch[-1])
+    return jd_id, len(pending)
 
 
 # =====================
 # File Processor (PDF, DOCX, IMAGE)
 # =====================
 def process_resume_file(file, jd_text, model):
-    file_type = file.name.split('.')[-1].lower()
-    if file_type == "pdf":
-        text = extract_text_from_pdf(file)
-    elif file_type == "docx":
-        text = extract_text_from_docx(file)
-    else:
-        text = extract_text_from_image(file)
-
-    entities = extract_entities(text, jd_text)
-    entities['score'] = match_score_bert(text, jd_text, model)
+    data = read_file_bytes(file)
+    text, error = extract_payloads([(os.path.basename(file.name), data)])[0]
+    if error:
+        raise ValueError(error)
+    with metrics.timed('entities', file_name=os.path.basename(file.name)):
+        spans = list(section_spans(text))
+        entities = extract_entities(text, jd_text, sectionize(text, spans=spans))
+    entities['content_hash'] = content_hash(data)
+    entities['resume_text'] = text
+    with metrics.timed('embed'):
+        chunk_vectors = encode_chunks([chunk_text(text, spans)], model)[0]
+    entities['score'] = float(pool_scores(chunk_vectors, get_jd_embedding(jd_text, model)))
+    attach_embedding(entities, chunk_vectors)
     return entities
+
+
+# =====================
+# Batch File Processor
+# =====================
+@contextmanager
+def stage_timer(timings, stage):
+    # Accumulates wall time per pipeline stage into an optional dict
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+def process_resume_files(files, jd_text, model, batch_size=32, skip_duplicates=True, timings=None):
+    # Extract every file first (on the process pool), then embed the chunks of
+    # all resumes in one batched call and the JD once, so a batch costs one
+    # forward pass instead of two per file. Files whose bytes were already ingested (or
+    # repeat earlier in the batch) are skipped before any parsing.
+    with stage_timer(timings, 'dedup'):
+        payloads = [(os.path.basename(f.name), read_file_bytes(f)) for f in files]
+        hashes = [content_hash(data) for _, data in payloads]
+        existing = find_resumes_by_hash(hashes) if skip_duplicates else {}
+
+    results = []
+    pending = []
+    seen = {}
+    for (file_name, data), digest in zip(payloads, hashes):
+        result = {'file_name': file_name, 'content_hash': digest, 'text': None, 'spans': None, 'sections': None,
+                  'data': None, 'error': None, 'duplicate_of': None}
+        if skip_duplicates and digest in existing:
+            result['duplicate_of'] = existing[digest]
+        elif skip_duplicates and digest in seen:
+            result['duplicate_of'] = seen[digest]
+        else:
+            seen[digest] = file_name
+            pending.append((result, data))
+        results.append(result)
+
+    with stage_timer(timings, 'extract'):
+        texts = extract_payloads([(r['file_name'], data) for r, data in pending])
+
+    pending = [r for r, _ in pending]
+    with stage_timer(timings, 'entities'):
+        for r, (text, error) in zip(pending, texts):
+            if error:
+                r['error'] = error
+                continue
+            try:
+                with metrics.timed('entities', file_name=r['file_name']):
+                    # One pass over the lines serves both the entities and the chunks
+                    r['spans'] = list(section_spans(text))
+                    r['sections'] = sectionize(text, spans=r['spans'])
+                    r['data'] = extract_entities(text, jd_text, r['sections'])
+                r['data']['content_hash'] = r['content_hash']
+                r['data']['resume_text'] = text
+                r['text'] = text
+            except Exception as e:
+                r['error'] = str(e)
+
+    parsed = [r for r in pending if r['data'] is not None]
+    if parsed:
+        with stage_timer(timings, 'embed'), metrics.timed('embed', items=len(parsed)):
+            chunk_sets = encode_chunks([chunk_text(r['text'], r['spans']) for r in parsed], model, batch_size)
+            scores = pooled_scores(chunk_sets, get_jd_embedding(jd_text, model))
+        for r, chunk_vectors, score in zip(parsed, chunk_sets, scores):
+            r['data']['score'] = float(score)
+            attach_embedding(r['data'], chunk_vectors)
+    return results
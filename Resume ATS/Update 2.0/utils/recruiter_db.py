@@ -1,9 +1,10 @@
 import sqlite3
+from utils.connections import get_connection
 
 DB_PATH = "recruiter.db"
 
 def connect_db():
-    return sqlite3.connect(DB_PATH)
+    return get_connection(DB_PATH)
 
 def init_recruiter_db():
     with connect_db() as conn:
@@ -0,0 +1,104 @@
+import json
+import os
+import re
+
+# Canonical skill -> spellings that should count as the same skill.
+# Extend or override with a skill_taxonomy.json file next to the app.
+SKILL_TAXONOMY = {
+    'power bi': ['powerbi', 'power-bi', 'microsoft power bi'],
+    'excel': ['ms excel', 'microsoft excel', 'ms-excel'],
+    'javascript': ['js'],
+    'typescript': ['ts'],
+    'node.js': ['nodejs'],
+    'react': ['reactjs', 'react.js'],
+    'c++': ['cpp'],
+    'c#': ['csharp', 'c sharp'],
+    'sql': ['structured query language'],
+    'postgresql': ['postgres'],
+    'machine learning': ['ml'],
+    'scikit-learn': ['sklearn', 'scikit learn'],
+    'aws': ['amazon web services'],
+    'gcp': ['google cloud platform', 'google cloud'],
+    'quickbooks': ['quick books'],
+    'sap': ['sap erp'],
+}
+SKILL_TAXONOMY_PATH = "skill_taxonomy.json"
+
+_TOKEN = re.compile(r'[a-z0-9+#]+(?:\.[a-z0-9+#]+)*')
+_taxonomy = None
+_taxonomy_matcher = None
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+def load_taxonomy():
+    global _taxonomy
+    if _taxonomy is None:
+        taxonomy = {k: list(v) for k, v in SKILL_TAXONOMY.items()}
+        if os.path.exists(SKILL_TAXONOMY_PATH):
+            with open(SKILL_TAXONOMY_PATH, "r", encoding="utf-8") as f:
+                for canonical, variants in json.load(f).items():
+                    taxonomy.setdefault(canonical.lower(), []).extend(v.lower() for v in variants)
+        _taxonomy = taxonomy
+    return _taxonomy
+
+def canonical_skill(skill, taxonomy=None):
+    taxonomy = taxonomy or load_taxonomy()
+    skill = ' '.join(tokenize(skill))
+    for canonical, variants in taxonomy.items():
+        if skill == canonical or skill in (' '.join(tokenize(v)) for v in variants):
+            return canonical
+    return skill
+
+
+# =====================
+# Compiled Skill Matcher
+# =====================
+def compile_skill_matcher(skills, taxonomy=None):
+    # Every skill (and its taxonomy synonyms) becomes a token tuple, so matching
+    # respects word boundaries: "sql" never fires inside "mysql".
+    taxonomy = taxonomy or load_taxonomy()
+    aliases = {}
+    for canonical, variants in taxonomy.items():
+        for v in [canonical, *variants]:
+            aliases[tuple(tokenize(v))] = canonical
+
+    phrases = {}
+    order = []
+    for skill in skills:
+        tokens = tuple(tokenize(skill))
+        if not tokens:
+            continue
+        canonical = aliases.get(tokens, ' '.join(tokens))
+        if canonical in order:
+            continue
+        order.append(canonical)
+        phrases[tokens] = canonical
+        for v in taxonomy.get(canonical, []):
+            phrases[tuple(tokenize(v))] = canonical
+        phrases[tuple(tokenize(canonical))] = canonical
+    return {
+        'phrases': phrases,
+        'order': order,
+        'max_len': max((len(p) for p in phrases), default=0),
+    }
+
+def match_skills(matcher, text):
+    # One pass over the resume tokens, probing phrases up to the longest skill
+    phrases = matcher['phrases']
+    max_len = matcher['max_len']
+    tokens = tokenize(text)
+    found = set()
+    for i in range(len(tokens)):
+        for n in range(1, min(max_len, len(tokens) - i) + 1):
+            canonical = phrases.get(tuple(tokens[i:i + n]))
+            if canonical is not None:
+                found.add(canonical)
+    return [s for s in matcher['order'] if s in found]
+
+def taxonomy_skills_in(text):
+    # Multi-word and synonym skills from the shared taxonomy that appear in text
+    global _taxonomy_matcher
+    if _taxonomy_matcher is None:
+        _taxonomy_matcher = compile_skill_matcher(load_taxonomy().keys())
+    return match_skills(_taxonomy_matcher, text)